@@ -0,0 +1,5 @@
+"""
+運用者向けの管理API
+
+署名付きのデバッグトークン（X-Debug-Profile）を持つリクエストのみ受け付ける
+"""
@@ -0,0 +1,53 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.profiling import DEBUG_HEADER, PROFILING_SECRET, profile_store, verify_debug_token
+
+def require_debug_token(
+    token: Optional[str] = Header(None, alias=DEBUG_HEADER)
+) -> None:
+    """署名付きのデバッグトークンを確認する"""
+    if not verify_debug_token(token, PROFILING_SECRET):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="有効なデバッグトークンが必要です"
+        )
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_debug_token)]
+)
+
+@router.get("/profiles")
+async def list_profiles():
+    """
+    プロファイルを取得したルートの一覧（リクエスト数・サンプル数）を取得する
+    """
+    return profile_store.routes()
+
+@router.get("/profiles/collapsed", response_class=PlainTextResponse)
+async def get_collapsed_profile(route: Optional[str] = None):
+    """
+    collapsed-stack形式のプロファイルを取得する
+
+    flamegraph.pl や speedscope にそのまま渡せる。
+    routeを省略した場合は全ルート分（先頭のフレームがルート名）
+    """
+    return profile_store.collapsed(route)
+
+@router.get("/profiles/flamegraph")
+async def get_flamegraph(route: Optional[str] = None):
+    """
+    フレームグラフ用のツリー（d3-flame-graph形式）を取得する
+    """
+    return profile_store.flamegraph(route)
+
+@router.delete("/profiles", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_profiles():
+    """
+    集計したプロファイルを破棄する
+    """
+    profile_store.clear()
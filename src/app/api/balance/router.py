@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timedelta
 
 from app.db.database import get_db
@@ -13,22 +13,70 @@ from app.schemas.balance import (
 )
 from app.auth.dependencies import get_current_user
 from app.models.user import User
+from app.core.affordability import invalidate_affordability
+from app.core.identity import Identity, get_identity
+from app.core.serialization import FastJSONResponse, parse_fields, query_response
+from app.core.singleflight import single_flight
 
 router = APIRouter(
     prefix="/balance",
     tags=["balance"]
 )
 
+# 取引履歴で fields= に指定できる項目と対応する列
+TRANSACTION_FIELDS = {
+    "id": Transaction.id,
+    "amount": Transaction.amount,
+    "transaction_type": Transaction.transaction_type,
+    "description": Transaction.description,
+    "created_at": Transaction.created_at,
+}
+
+# 現在の残高で fields= に指定できる項目
+BALANCE_FIELDS = list(BalanceResponse.__fields__)
+# 最後の取引を参照する項目（指定されていなければ取引を取得しない）
+LAST_TRANSACTION_FIELDS = {
+    "last_transaction_amount": Transaction.amount,
+    "last_transaction_type": Transaction.transaction_type,
+    "last_transaction_date": Transaction.created_at,
+}
+
+def _fields_or_400(fields: Optional[str], available: List[str]) -> List[str]:
+    """fields= を検証し、不正な場合は400を返す"""
+    try:
+        return parse_fields(fields, available)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/current", response_model=BalanceResponse)
 async def get_current_balance(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    identity: Identity = Depends(get_identity),
+    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description="返す項目（カンマ区切り。例: current_balance,savings_goal）")
 ):
     """現在の残高を取得する"""
-    balance = db.query(Balance).filter(Balance.user_id == current_user.id).first()
+    names = _fields_or_400(fields, BALANCE_FIELDS)
+    balance = identity.balance
     if not balance:
         raise HTTPException(status_code=404, detail="Balance not found")
-    return balance
+
+    values = {
+        "current_balance": balance.current_amount,
+        "savings_goal": balance.savings_goal,
+        "achievement_rate": (
+            min(balance.current_amount / balance.savings_goal * 100, 100.0)
+            if balance.savings_goal else None
+        ),
+    }
+    last_columns = [name for name in names if name in LAST_TRANSACTION_FIELDS]
+    if last_columns:
+        last = db.query(*[LAST_TRANSACTION_FIELDS[name] for name in last_columns])\
+            .filter(Transaction.user_id == identity.user_id)\
+            .order_by(Transaction.created_at.desc())\
+            .first()
+        values.update(zip(last_columns, last or [None] * len(last_columns)))
+
+    return FastJSONResponse({name: values.get(name) for name in names})
 
 @router.post("/deposit", response_model=BalanceResponse)
 async def deposit_money(
@@ -57,6 +105,7 @@ async def deposit_money(
     db.add(new_transaction)
     db.commit()
     db.refresh(balance)
+    invalidate_affordability(current_user.id)
     
     return balance
 
@@ -86,6 +135,7 @@ async def withdraw_money(
     db.add(new_transaction)
     db.commit()
     db.refresh(balance)
+    invalidate_affordability(current_user.id)
     
     return balance
 
@@ -94,19 +144,37 @@ async def get_transaction_history(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description="返す項目（カンマ区切り。例: created_at,amount,transaction_type）"),
+    since: Optional[datetime] = Query(None, description="この日時以降の取引に絞り込む"),
+    until: Optional[datetime] = Query(None, description="この日時より前の取引に絞り込む")
 ):
-    """取引履歴を取得する"""
-    transactions = db.query(Transaction)\
-        .filter(Transaction.user_id == current_user.id)\
+    """
+    取引履歴を取得する
+
+    fields= を指定した場合は、その列だけをSELECTして返す。
+    since / until を指定すると、取引テーブルがパーティション化されている場合は
+    該当する月のパーティションだけを読む
+    """
+    names = _fields_or_400(fields, list(TRANSACTION_FIELDS))
+    query = db.query(*[TRANSACTION_FIELDS[name] for name in names])\
+        .filter(Transaction.user_id == current_user.id)
+    if since is not None:
+        query = query.filter(Transaction.created_at >= since)
+    if until is not None:
+        query = query.filter(Transaction.created_at < until)
+    query = query\
         .order_by(Transaction.created_at.desc())\
         .offset(skip)\
-        .limit(limit)\
-        .all()
-    return transactions
+        .limit(limit)
+    return query_response(query)
 
 @router.get("/forecast", response_model=List[BalanceForecast])
-async def get_balance_forecast(
+# 同じユーザー・期間の同時リクエスト（家族の複数端末など）は1回の計算にまとめる。
+# 同期関数としてスレッドプールで実行させ、実行中の計算にだけ相乗りする（完了後の結果は使い回さないため、
+# 入出金の後に古い予測を返さない）
+@single_flight(key=lambda current_user, days, **_: (current_user.id, days), grace=0)
+def get_balance_forecast(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     days: int = 30
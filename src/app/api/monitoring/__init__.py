@@ -0,0 +1,5 @@
+"""
+監視用のエンドポイント（Prometheus形式のメトリクス・ヘルスチェック）
+
+METRICS_TOKEN を設定した場合は Authorization: Bearer <METRICS_TOKEN> を持つリクエストのみ受け付ける
+"""
@@ -0,0 +1,62 @@
+from typing import Optional
+import hmac
+import os
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import JSONResponse
+
+from app.core.db_manager import db_manager
+from app.core.metrics import metrics_registry
+
+# メトリクスの取得に必要なトークン
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# トークンなしでのメトリクスの取得を許可するか（内部ネットワークからのみ届く構成向け。既定は許可しない）
+METRICS_ALLOW_ANONYMOUS = os.getenv("METRICS_ALLOW_ANONYMOUS", "").lower() in ("1", "true", "yes")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    METRICS_TOKEN のBearerトークンを確認する
+
+    トークンが未設定の場合は METRICS_ALLOW_ANONYMOUS が有効なときのみ許可する
+    """
+    if METRICS_TOKEN is None:
+        if METRICS_ALLOW_ANONYMOUS:
+            return
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Metrics are disabled: METRICS_TOKEN is not configured"
+        )
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token, METRICS_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+router = APIRouter(tags=["monitoring"])
+
+@router.get("/metrics", dependencies=[Depends(require_metrics_token)])
+def get_metrics():
+    """
+    Prometheus のテキスト形式でメトリクスを取得する
+
+    DBのヘルスチェックを含むため、スレッドプールで実行する
+    """
+    return Response(content=metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@router.get("/health")
+def health():
+    """
+    ヘルスチェック（DBの確認結果は一定時間使い回す）
+
+    ロードバランサーから認証なしで呼ばれるため、トークンを要求しない
+    """
+    if not db_manager.health_check():
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unhealthy", "database": False}
+        )
+    return {"status": "ok", "database": True}
@@ -0,0 +1,6 @@
+"""
+保護者向けのレポートAPI
+
+取引テーブルではなく日次・月次の集計テーブル（app.core.rollups）だけを読むため、
+取引の履歴の長さに関係なく応答できる
+"""
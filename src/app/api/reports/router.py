@@ -0,0 +1,71 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.auth.dependencies import get_current_user
+from app.models.user import User
+from app.core.partitioning import add_months, month_start
+from app.core.rollups import daily_report, monthly_report
+from app.core.serialization import FastJSONResponse
+
+router = APIRouter(
+    prefix="/reports",
+    tags=["reports"]
+)
+
+# 日次のレポートで1回に取得できる最大日数
+MAX_DAILY_RANGE_DAYS = 366
+# 月次のレポートで1回に取得できる最大月数
+MAX_MONTHLY_RANGE_MONTHS = 120
+
+def _target_user_id(current_user: User, user_id: Optional[int]) -> int:
+    """レポートの対象ユーザー（他のユーザーを指定できるのは管理者のみ）"""
+    if user_id is None or user_id == current_user.id:
+        return current_user.id
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not allowed to view this user's report")
+    return user_id
+
+@router.get("/daily")
+async def get_daily_report(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    user_id: Optional[int] = Query(None, description="対象のユーザー（未指定時は自分）"),
+    since: Optional[date] = Query(None, description="最初の日（未指定時は29日前）"),
+    until: Optional[date] = Query(None, description="最後の日（未指定時は今日）")
+):
+    """
+    日ごとの入金・支出・取引タイプ別の合計を取得する
+    """
+    until = until or datetime.utcnow().date()
+    since = since or until - timedelta(days=29)
+    if since > until:
+        raise HTTPException(status_code=400, detail="since must not be after until")
+    if (until - since).days >= MAX_DAILY_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range must be at most {MAX_DAILY_RANGE_DAYS} days"
+        )
+    return FastJSONResponse(
+        daily_report(db, _target_user_id(current_user, user_id), since, until)
+    )
+
+@router.get("/monthly")
+async def get_monthly_report(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    user_id: Optional[int] = Query(None, description="対象のユーザー（未指定時は自分）"),
+    months: int = Query(12, ge=1, le=MAX_MONTHLY_RANGE_MONTHS, description="今月を含む取得する月数"),
+    until: Optional[date] = Query(None, description="最後の月（未指定時は今月）")
+):
+    """
+    月ごとの入金・支出・取引タイプ別の合計を取得する（お小遣いの使い方の推移）
+    """
+    last_month = month_start(until or datetime.utcnow().date())
+    first_month = add_months(last_month, -(months - 1))
+    return FastJSONResponse(
+        monthly_report(db, _target_user_id(current_user, user_id), first_month, last_month)
+    )
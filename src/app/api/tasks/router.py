@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from typing import List
 from sqlalchemy.orm import Session
 
@@ -8,14 +10,26 @@ from app.schemas.task import (
     QuestTaskCreate,
     TaskComplete,
     TaskResponse,
+    QuestRewardResponse,
+    TaskBatchComplete,
+    TaskBatchResponse,
 )
 from app.crud.task import (
     create_regular_task,
     create_quest_task,
     complete_task,
-    get_user_tasks,
 )
 from app.api.deps import get_current_user
+from app.core.affordability import invalidate_affordability
+from app.core.serialization import FastJSONResponse
+from app.core.task_board import get_task_board, invalidate_task_board, list_user_tasks
+from app.core.task_manager import task_manager
+from app.core.task_completion import (
+    IdempotencyKeyReusedError,
+    bulk_complete_tasks,
+    bulk_verify_completions,
+    complete_quest_with_reward,
+)
 
 router = APIRouter()
 
@@ -34,6 +48,8 @@ async def create_regular_task_endpoint(
             task=task,
             user_id=current_user.id
         )
+        invalidate_task_board(current_user.id)
+        invalidate_affordability(current_user.id)
         return created_task
     except Exception as e:
         raise HTTPException(
@@ -56,6 +72,7 @@ async def create_quest_task_endpoint(
             task=task,
             user_id=current_user.id
         )
+        invalidate_task_board(current_user.id)
         return created_task
     except Exception as e:
         raise HTTPException(
@@ -83,6 +100,7 @@ async def complete_task_endpoint(
                 status_code=404,
                 detail="タスクが見つかりません"
             )
+        invalidate_task_board(current_user.id)
         return updated_task
     except HTTPException as he:
         raise he
@@ -92,6 +110,87 @@ async def complete_task_endpoint(
             detail=f"タスクの完了処理に失敗しました: {str(e)}"
         )
 
+@router.put("/complete/batch", response_model=TaskBatchResponse)
+async def complete_tasks_batch_endpoint(
+    batch: TaskBatchComplete,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    複数のタスクの完了・確認をまとめて行うエンドポイント
+
+    項目ごとの結果を返し、存在しない項目があっても他の項目は処理する
+    """
+    try:
+        completed = bulk_complete_tasks(
+            db=db,
+            task_ids=batch.complete_task_ids,
+            user_id=current_user.id,
+            completed_at=batch.completed_at
+        )
+        verified = bulk_verify_completions(
+            db=db,
+            completion_ids=batch.verify_completion_ids,
+            user_id=current_user.id
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"タスクの一括処理に失敗しました: {str(e)}"
+        )
+
+    invalidate_task_board(current_user.id)
+    return TaskBatchResponse(completed=completed, verified=verified)
+
+@router.put("/quest/complete", response_model=QuestRewardResponse)
+async def complete_quest_endpoint(
+    task_complete: TaskComplete,
+    idempotency_key: str = Header(..., alias="Idempotency-Key", min_length=1, max_length=64),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    クエストを完了にして報酬を即時付与するエンドポイント
+
+    同じIdempotency-Keyでの再送には最初の結果を返す。
+    DB処理はスレッドプールで行い、連打時にもイベントループを塞がない
+    """
+    try:
+        result = await run_in_threadpool(
+            complete_quest_with_reward,
+            db=db,
+            quest_id=task_complete.task_id,
+            user_id=current_user.id,
+            idempotency_key=idempotency_key
+        )
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Idempotency-Keyが別のクエストで使用されています: {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=409,
+            detail=f"クエストは既に完了しています: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"クエストの完了処理に失敗しました: {str(e)}"
+        )
+
+    if not result:
+        raise HTTPException(
+            status_code=404,
+            detail="クエストが見つかりません"
+        )
+    if not result.replayed:
+        invalidate_task_board(current_user.id)
+        invalidate_affordability(current_user.id)
+    return result
+
 @router.get("/list", response_model=List[TaskResponse])
 async def list_tasks_endpoint(
     db: Session = Depends(get_db),
@@ -101,13 +200,53 @@ async def list_tasks_endpoint(
     ユーザーのタスク一覧を取得するエンドポイント
     """
     try:
-        tasks = get_user_tasks(
+        return FastJSONResponse(list_user_tasks(db, current_user.id))
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"タスク一覧の取得に失敗しました: {str(e)}"
+        )
+
+@router.get("/board")
+async def task_board_endpoint(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    お仕事ボード・クエストボードと今期の完了記録をまとめて取得するエンドポイント
+
+    ETagを返し、If-None-Matchが一致する場合は304を返す
+    """
+    try:
+        etag, board = get_task_board(
             db=db,
             user_id=current_user.id
         )
-        return tasks
     except Exception as e:
         raise HTTPException(
             status_code=400,
-            detail=f"タスク一覧の取得に失敗しました: {str(e)}"
-        )
\ No newline at end of file
+            detail=f"タスクボードの取得に失敗しました: {str(e)}"
+        )
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=board, headers=headers)
+
+@router.get("/stats")
+async def task_stats_endpoint(
+    current_user = Depends(get_current_user)
+):
+    """
+    バックグラウンドタスクの実行統計を取得するエンドポイント（管理者のみ）
+
+    待ち時間・実行時間の分布や実行中タスク数から、max_workersの調整に使う。
+    全ユーザー分のタスク名を含むため、管理者以外には返さない
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403,
+            detail="タスクの実行統計を参照する権限がありません"
+        )
+    return task_manager.get_stats()
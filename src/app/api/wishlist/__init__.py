@@ -1,6 +1,7 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from pydantic import BaseModel
 from datetime import datetime
+import os
 
 class WishlistConfig:
     """
@@ -24,6 +25,11 @@ class WishlistConfig:
         self.default_sort: str = self.SORT_BY_PRIORITY
         self.allowed_image_types: List[str] = ["image/jpeg", "image/png", "image/gif"]
         self.max_image_size: int = 5 * 1024 * 1024  # 5MB
+        # 画像の保存先（内容のハッシュをファイル名にして保存する）
+        self.upload_dir: str = os.getenv("WISHLIST_UPLOAD_DIR", "uploads/wishlist")
+        self.image_url_prefix: str = "/uploads/wishlist"
+        self.upload_chunk_size: int = 64 * 1024  # 64KB
+        self.thumbnail_size: Tuple[int, int] = (256, 256)
         
     @property
     def valid_sort_options(self) -> List[str]:
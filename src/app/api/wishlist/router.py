@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.core.database import get_db
@@ -6,10 +7,26 @@ from app.models.wishlist import WishlistItem
 from app.schemas.wishlist import (
     WishlistItemCreate,
     WishlistItemResponse,
+    WishlistMoveRequest,
     WishlistReorderRequest
 )
 from app.core.auth import get_current_user
 from app.models.user import User
+from app.api.wishlist import wishlist_config
+from app.core.affordability import get_wishlist_affordability, invalidate_affordability
+from app.core.serialization import query_response
+from app.core.image_store import (
+    ImageTooLargeError,
+    UnsupportedImageError,
+    generate_thumbnail,
+    save_image_stream
+)
+from app.core.wishlist_order import (
+    REBALANCE_KEY_LENGTH,
+    bulk_assign_order,
+    key_between,
+    rebalance_order
+)
 
 router = APIRouter(
     prefix="/wishlist",
@@ -26,10 +43,10 @@ async def add_wishlist_item(
     新しい欲しいものリストアイテムを追加する
     """
     try:
-        # 現在の最大順序を取得
-        max_order = db.query(WishlistItem).filter(
+        # 末尾のキーの後ろに追加する
+        last_order = db.query(func.max(WishlistItem.order)).filter(
             WishlistItem.user_id == current_user.id
-        ).count()
+        ).scalar()
 
         new_item = WishlistItem(
             user_id=current_user.id,
@@ -37,11 +54,12 @@ async def add_wishlist_item(
             price=item.price,
             priority=item.priority,
             url=item.url,
-            order=max_order + 1
+            order=key_between(last_order, None)
         )
         db.add(new_item)
         db.commit()
         db.refresh(new_item)
+        invalidate_affordability(current_user.id)
         return new_item
     except Exception as e:
         db.rollback()
@@ -50,6 +68,63 @@ async def add_wishlist_item(
             detail="アイテムの追加に失敗しました"
         )
 
+@router.put("/move", status_code=status.HTTP_200_OK)
+async def move_wishlist_item(
+    move_request: WishlistMoveRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    欲しいものリストのアイテムを1件移動する（ドラッグ&ドロップ用）
+
+    移動先の前後のアイテムのキーの間にキーを作るため、書き換えるのは移動したアイテムのみ
+    """
+    try:
+        ids = {move_request.item_id, move_request.before_id, move_request.after_id} - {None}
+        keys = dict(db.query(WishlistItem.id, WishlistItem.order).filter(
+            WishlistItem.id.in_(ids),
+            WishlistItem.user_id == current_user.id
+        ).all())
+
+        missing = ids - set(keys)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"アイテムID {sorted(missing)} が見つかりません"
+            )
+
+        try:
+            new_order = key_between(
+                keys.get(move_request.before_id),
+                keys.get(move_request.after_id)
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="移動先の前後関係が正しくありません。リストを再取得してください"
+            )
+
+        db.query(WishlistItem).filter(
+            WishlistItem.id == move_request.item_id,
+            WishlistItem.user_id == current_user.id
+        ).update({"order": new_order}, synchronize_session=False)
+        db.commit()
+        # 購入可能日の予測はリストの順に並べて返すため、キャッシュを破棄する
+        invalidate_affordability(current_user.id)
+
+        if len(new_order) > REBALANCE_KEY_LENGTH:
+            background_tasks.add_task(rebalance_order, WishlistItem, current_user.id)
+        return {"message": "順序を更新しました", "order": new_order}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="順序の更新に失敗しました"
+        )
+
 @router.put("/reorder", status_code=status.HTTP_200_OK)
 async def reorder_wishlist(
     reorder_request: WishlistReorderRequest,
@@ -58,24 +133,32 @@ async def reorder_wishlist(
 ):
     """
     欲しいものリストの順序を更新する
+
+    指定された順にキーを振り直し、1回の UPDATE ... CASE でまとめて書き込む
     """
     try:
-        for item_order in reorder_request.items:
-            db_item = db.query(WishlistItem).filter(
-                WishlistItem.id == item_order.item_id,
+        item_ids = [item_order.item_id for item_order in reorder_request.items]
+        owned = {
+            item_id for item_id, in db.query(WishlistItem.id).filter(
+                WishlistItem.id.in_(item_ids),
                 WishlistItem.user_id == current_user.id
-            ).first()
-            
-            if not db_item:
+            )
+        }
+        for item_id in item_ids:
+            if item_id not in owned:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"アイテムID {item_order.item_id} が見つかりません"
+                    detail=f"アイテムID {item_id} が見つかりません"
                 )
-            
-            db_item.order = item_order.new_order
-        
+
+        ordered_ids = [
+            item_order.item_id for item_order in
+            sorted(reorder_request.items, key=lambda item_order: item_order.new_order)
+        ]
+        keys = bulk_assign_order(db, WishlistItem, current_user.id, ordered_ids)
         db.commit()
-        return {"message": "順序を更新しました"}
+        invalidate_affordability(current_user.id)
+        return {"message": "順序を更新しました", "orders": keys}
     except HTTPException:
         raise
     except Exception as e:
@@ -94,12 +177,105 @@ async def get_wishlist_items(
     ユーザーの欲しいものリストを取得する
     """
     try:
-        items = db.query(WishlistItem).filter(
+        query = db.query(
+            WishlistItem.id,
+            WishlistItem.name,
+            WishlistItem.price,
+            WishlistItem.priority,
+            WishlistItem.url,
+            WishlistItem.memo,
+            WishlistItem.image_url,
+            WishlistItem.order,
+            WishlistItem.created_at
+        ).filter(
             WishlistItem.user_id == current_user.id
-        ).order_by(WishlistItem.order).all()
-        return items
+        ).order_by(WishlistItem.order, WishlistItem.id)
+        return query_response(query)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="アイテムの取得に失敗しました"
-        )
\ No newline at end of file
+        )
+
+@router.get("/affordability")
+async def get_wishlist_affordability_endpoint(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    欲しいものリストの各アイテムを買えるようになる日の予測を取得する
+
+    現在の残高・見込みのお仕事収入・利率から全アイテム分をまとめて計算する
+    """
+    try:
+        return get_wishlist_affordability(db, current_user.id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="購入可能日の予測に失敗しました"
+        )
+
+@router.post("/{item_id}/image", response_model=WishlistItemResponse)
+async def upload_wishlist_image(
+    item_id: int,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    欲しいものリストのアイテムに画像をアップロードする
+
+    リクエストボディに画像のバイナリをそのまま送る（multipartではない）。
+    受信しながらディスクへ書き出し、サイズ上限を超えた時点で打ち切る。
+    サムネイルはレスポンスを返した後にプロセスプールで作成する
+    """
+    item = db.query(WishlistItem).filter(
+        WishlistItem.id == item_id,
+        WishlistItem.user_id == current_user.id
+    ).first()
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="アイテムが見つかりません"
+        )
+
+    # 申告されたサイズが上限を超えている場合は受信せずに断る
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and not wishlist_config.validate_image_size(int(content_length)):
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="画像のサイズが大きすぎます"
+        )
+
+    try:
+        image = await save_image_stream(
+            request.stream(),
+            upload_dir=wishlist_config.upload_dir,
+            max_size=wishlist_config.max_image_size,
+            allowed_types=wishlist_config.allowed_image_types
+        )
+    except ImageTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="画像のサイズが大きすぎます"
+        )
+    except UnsupportedImageError:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="対応していない画像形式です"
+        )
+
+    try:
+        item.image_url = f"{wishlist_config.image_url_prefix}/{image.relative_path}"
+        db.commit()
+        db.refresh(item)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="画像の登録に失敗しました"
+        )
+
+    background_tasks.add_task(generate_thumbnail, image, wishlist_config.thumbnail_size)
+    return item
@@ -0,0 +1,5 @@
+"""
+性能計測用のスクリプト
+
+各モジュールは `python -m app.benchmarks.<name>` で単体実行する
+"""
@@ -0,0 +1,71 @@
+"""
+パッケージの読み込み時間（コールドスタート）の計測
+
+計測対象ごとに新しいPythonプロセスを起動し、import文の実行時間を測る。
+app.models / app.schemas はパッケージ自体の読み込みと、1つの名前だけを
+参照した場合、全ての名前を参照した場合（従来の一括読み込み相当）を比べる
+
+実行: python -m app.benchmarks.bench_import [繰り返し回数]
+"""
+from statistics import median
+from typing import List, Optional, Tuple
+import os
+import subprocess
+import sys
+
+TARGETS = [
+    ("app.schemas (package only)", "import app.schemas"),
+    ("app.schemas (one name)", "from app.schemas import WishlistItemCreate"),
+    ("app.schemas (all names)", "from app.schemas import *"),
+    ("app.models (package only)", "import app.models"),
+    ("app.models (one name)", "from app.models import WishlistItem"),
+    ("app.models (all names)", "from app.models import *"),
+]
+
+# 子プロセスで実行するコード（import文の前後の時間を出力する）
+_PROBE = """
+import time, warnings
+warnings.simplefilter("ignore")
+started = time.perf_counter()
+{statement}
+print(time.perf_counter() - started)
+"""
+
+def measure(statement: str) -> Tuple[Optional[float], Optional[str]]:
+    """
+    新しいプロセスでimport文を1回実行した時間（秒）
+
+    Returns:
+        Tuple[Optional[float], Optional[str]]: (時間, 失敗した場合は例外のメッセージ)
+    """
+    src_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=src_dir, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statement=statement)],
+        capture_output=True,
+        text=True,
+        env=env
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        return None, lines[-1] if lines else f"exit code {result.returncode}"
+    return float(result.stdout.strip().splitlines()[-1]), None
+
+def main(repeat: int) -> None:
+    print(f"{'target':<30} {'median (ms)':>12} {'min (ms)':>10}")
+    for label, statement in TARGETS:
+        samples: List[float] = []
+        error = None
+        for _ in range(repeat):
+            elapsed, error = measure(statement)
+            if elapsed is None:
+                break
+            samples.append(elapsed)
+        if not samples:
+            # 計測できなかった理由（読み込めないモジュールなど）を表示する
+            print(f"{label:<30} {'failed':>12}  {error}")
+            continue
+        print(f"{label:<30} {median(samples) * 1000:>12.2f} {min(samples) * 1000:>10.2f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,85 @@
+"""
+一覧エンドポイントのシリアライズ方式の比較
+
+- ORMインスタンス → response_modelで検証 → jsonable_encoder → json（従来の経路）
+- 列のタプル → 辞書 → FastJSONResponse（新しい経路）
+
+実行: python -m app.benchmarks.bench_serialization [件数 ...]
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, List, Optional
+import json
+import sys
+import time
+import warnings
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app.core.serialization import FastJSONResponse, orjson, rows_to_dicts
+
+# Pydantic v1 / v2 のどちらでも動くように両方の設定名を指定している
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+warnings.filterwarnings("ignore", message="Valid config keys have changed")
+
+KEYS = ["id", "name", "price", "priority", "url", "memo", "image_url", "order", "created_at"]
+
+class ItemResponse(BaseModel):
+    """WishlistItemResponseと同じ形のレスポンススキーマ"""
+    id: int
+    name: str
+    price: int
+    priority: Optional[int] = None
+    url: Optional[str] = None
+    memo: Optional[str] = None
+    image_url: Optional[str] = None
+    order: str
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+        from_attributes = True
+
+def make_rows(count: int) -> List[tuple]:
+    """テスト用の行を作る"""
+    base = datetime(2024, 1, 1, 9, 0, 0)
+    return [
+        (
+            i, f"アイテム{i}", 1000 + i, i % 5, f"https://example.com/items/{i}",
+            "誕生日までに買いたい", None, f"V{i:06d}", base + timedelta(minutes=i)
+        )
+        for i in range(count)
+    ]
+
+def orm_path(rows: List[tuple]) -> bytes:
+    """従来の経路（ORMインスタンスの検証とエンコード）"""
+    objects = [SimpleNamespace(**dict(zip(KEYS, row))) for row in rows]
+    validated = [ItemResponse.from_orm(obj) for obj in objects]
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+def fast_path(rows: List[tuple]) -> bytes:
+    """新しい経路（列のタプルをそのままエンコード）"""
+    return FastJSONResponse(rows_to_dicts(KEYS, rows)).body
+
+def measure(func: Callable[[List[tuple]], bytes], rows: List[tuple], repeat: int) -> float:
+    """repeat回実行した中で最も速かった時間（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(rows)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main(counts: List[int]) -> None:
+    print(f"JSON backend: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'rows':>8} {'orm (ms)':>10} {'fast (ms)':>10} {'speedup':>8}")
+    for count in counts:
+        rows = make_rows(count)
+        repeat = 5 if count <= 1000 else 3
+        slow = measure(orm_path, rows, repeat)
+        fast = measure(fast_path, rows, repeat)
+        print(f"{count:>8} {slow * 1000:>10.2f} {fast * 1000:>10.2f} {slow / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000])
@@ -0,0 +1,103 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.compound_calculator import CompoundCalculator
+from app.models.balance import Balance
+from app.models.task import RegularTask, TaskFrequency
+from app.models.wishlist import WishlistItem
+
+# 既定の利率（週あたりのパーセント。毎週日曜に0.05%）
+DEFAULT_WEEKLY_INTEREST_RATE = Decimal('0.05')
+
+# 1週間あたりの実施回数
+WEEKLY_OCCURRENCES = {
+    TaskFrequency.DAILY: Decimal('7'),
+    TaskFrequency.WEEKLY: Decimal('1'),
+    TaskFrequency.MONTHLY: Decimal('12') / Decimal('52'),
+}
+
+# ユーザーごとの購入可能日の予測結果
+affordability_cache = TTLCache(maxsize=1024, ttl=300, name="wishlist_affordability")
+
+def weekly_work_income(db: Session, user_id: int) -> Decimal:
+    """
+    有効な定期タスクの報酬から、1週間あたりの見込み収入を求める
+    """
+    rows = db.query(RegularTask.frequency, func.sum(RegularTask.reward_amount))\
+        .filter(RegularTask.user_id == user_id, RegularTask.is_active.is_(True))\
+        .group_by(RegularTask.frequency)\
+        .all()
+    return sum(
+        (Decimal(total or 0) * WEEKLY_OCCURRENCES.get(frequency, Decimal('0')) for frequency, total in rows),
+        Decimal('0')
+    )
+
+def project_wishlist_affordability(
+    db: Session,
+    user_id: int,
+    weekly_interest_rate: Decimal = DEFAULT_WEEKLY_INTEREST_RATE,
+    today: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """
+    欲しいものリストの全アイテムについて、買えるようになる日を予測する
+
+    現在の残高・見込みのお仕事収入・利率から、全アイテム分を1回のシミュレーションで求める
+
+    Args:
+        db (Session): データベースセッション
+        user_id (int): ユーザーID
+        weekly_interest_rate (Decimal): 1週間あたりの利率（パーセント）
+        today (Optional[date]): 基準日（未指定時は今日）
+
+    Returns:
+        List[Dict[str, Any]]: アイテムごとの item_id / price / weeks / affordable_on
+    """
+    today = today or date.today()
+    balance = db.query(Balance.current_amount)\
+        .filter(Balance.user_id == user_id)\
+        .scalar() or 0
+    items = db.query(WishlistItem.id, WishlistItem.price)\
+        .filter(WishlistItem.user_id == user_id, WishlistItem.status == "active")\
+        .order_by(WishlistItem.order, WishlistItem.id)\
+        .all()
+
+    weeks = CompoundCalculator().project_affordability(
+        balance=Decimal(str(balance)),
+        prices={item_id: Decimal(price) for item_id, price in items},
+        weekly_income=weekly_work_income(db, user_id),
+        weekly_interest_rate=weekly_interest_rate
+    )
+
+    return [
+        {
+            "item_id": item_id,
+            "price": price,
+            "weeks": weeks[item_id],
+            "affordable_on": (
+                (today + timedelta(weeks=weeks[item_id])).isoformat()
+                if weeks[item_id] is not None else None
+            ),
+        }
+        for item_id, price in items
+    ]
+
+def get_wishlist_affordability(db: Session, user_id: int) -> List[Dict[str, Any]]:
+    """
+    キャッシュを利用して購入可能日の予測を取得する
+    """
+    cached = affordability_cache.get(user_id)
+    if cached is None:
+        cached = project_wishlist_affordability(db, user_id)
+        affordability_cache.set(user_id, cached)
+    return cached
+
+def invalidate_affordability(user_id: int) -> None:
+    """
+    残高・欲しいものリスト・お仕事の変更時に予測のキャッシュを破棄する
+    """
+    affordability_cache.invalidate(user_id)
@@ -0,0 +1,177 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import heapq
+import threading
+import time
+import weakref
+
+_MISSING = object()
+
+# 生成したキャッシュ（統計の出力用。キャッシュ自体の寿命には影響しない）
+_instances: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+
+class TTLCache:
+    """
+    有効期限付きのLRUキャッシュ
+
+    - 上限件数を超えると最も古く使われたエントリから破棄する
+    - エントリごとに有効期限を指定できる（未指定時は既定のTTL）
+    - スレッドセーフ（スレッドプールで動く同期エンドポイントからも利用できる）
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, name: Optional[str] = None):
+        """
+        Args:
+            maxsize (int): 保持する最大件数
+            ttl (float): 既定の有効期間（秒）
+            name (Optional[str]): 統計出力用の名前
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _instances.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        値を取得する（期限切れ・未登録の場合はdefault）
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        値を登録する
+
+        Args:
+            key: キー
+            value: 値
+            ttl (Optional[float]): このエントリの有効期間（秒）
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        エントリを削除する
+
+        Returns:
+            bool: 削除した場合True
+        """
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
+
+    def clear(self) -> None:
+        """全エントリを削除する"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        ヒット率などの統計情報を返す
+        """
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+class ExpiringSet:
+    """
+    有効期限付きの集合（トークンの失効リストなど、取りこぼしが許されない用途向け）
+
+    TTLCacheと違い件数による破棄は行わず、有効期限を過ぎた要素だけを削除する。
+    有効期限を指定しない要素は削除しない
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        """
+        Args:
+            name (Optional[str]): 統計出力用の名前
+        """
+        self.name = name
+        # 要素と有効期限（time.monotonic()基準。Noneは無期限）
+        self._expires: Dict[Hashable, Optional[float]] = {}
+        # 期限切れの削除用（要素を追加し直した場合は古い組が残るため、削除時に期限を照合する）
+        self._heap: List[Tuple[float, Any]] = []
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float) -> None:
+        """有効期限を過ぎた要素を削除する（ロックを取得した状態で呼ぶ）"""
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._heap)
+            if self._expires.get(key, _MISSING) == expires_at:
+                del self._expires[key]
+
+    def add(self, key: Hashable, ttl: Optional[float] = None) -> None:
+        """
+        要素を追加する
+
+        Args:
+            key: 要素
+            ttl (Optional[float]): 有効期間（秒）。Noneの場合は無期限
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            current = self._expires.get(key, _MISSING)
+            if ttl is None:
+                self._expires[key] = None
+                return
+            expires_at = now + ttl
+            # 既に長く保持している場合は短くしない
+            if current is None or (current is not _MISSING and current >= expires_at):
+                return
+            self._expires[key] = expires_at
+            heapq.heappush(self._heap, (expires_at, key))
+
+    def __contains__(self, key: Hashable) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            expires_at = self._expires.get(key, _MISSING)
+            if expires_at is _MISSING:
+                return False
+            if expires_at is not None and expires_at <= now:
+                self._purge(now)
+                return False
+            return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge(time.monotonic())
+            return len(self._expires)
+
+def all_caches() -> List[TTLCache]:
+    """
+    生成済みのキャッシュの一覧（名前順）
+    """
+    return sorted(list(_instances), key=lambda cache: cache.name or "")
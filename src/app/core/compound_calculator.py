@@ -134,6 +134,54 @@ class CompoundCalculator:
         
         return self._round(monthly_savings)
     
+    def project_affordability(
+        self,
+        balance: Decimal,
+        prices: Dict[int, Decimal],
+        weekly_income: Decimal,
+        weekly_interest_rate: Decimal,
+        max_weeks: int = 520
+    ) -> Dict[int, Optional[int]]:
+        """
+        各アイテムを買えるようになるまでの週数をまとめて求める
+
+        アイテムを金額順に並べ、残高の推移を1回だけ週ごとにシミュレーションしながら
+        到達したアイテムを順に確定させる（アイテムごとに計算し直さない）
+
+        Args:
+            balance: 現在の残高
+            prices: アイテムIDごとの金額
+            weekly_income: 1週間あたりの見込み収入（お仕事報酬）
+            weekly_interest_rate: 1週間あたりの利率（パーセント）
+            max_weeks: 予測する最大週数
+
+        Returns:
+            アイテムIDごとの週数（0=今すぐ買える、期間内に届かない場合はNone）
+        """
+        if balance < 0 or weekly_income < 0 or weekly_interest_rate < 0:
+            raise ValueError("Negative values are not allowed")
+
+        rate = weekly_interest_rate / Decimal('100')
+        pending = sorted(prices.items(), key=lambda item: item[1])
+        weeks: Dict[int, Optional[int]] = {item_id: None for item_id in prices}
+
+        amount = balance
+        index = 0
+        for week in range(max_weeks + 1):
+            while index < len(pending) and pending[index][1] <= amount:
+                weeks[pending[index][0]] = week
+                index += 1
+            if index == len(pending):
+                break
+            # 週末に利息が付き、その週の報酬が入る
+            next_amount = amount * (1 + rate) + weekly_income
+            if next_amount == amount:
+                # 収入も利息もない場合はそれ以上増えない
+                break
+            amount = next_amount
+
+        return weeks
+
     def _round(self, value: Decimal) -> Decimal:
         """指定された小数点以下の桁数に丸める"""
         return round(value, self.decimal_places)
\ No newline at end of file
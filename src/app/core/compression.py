@@ -0,0 +1,175 @@
+from typing import List, Optional, Tuple
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotliがない環境ではgzipのみ対応する
+    brotli = None
+
+# 圧縮の対象にするContent-Type（先頭一致）
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+def _accepted_encodings(accept_encoding: str) -> List[str]:
+    """Accept-Encodingから受け付け可能な（q=0でない）エンコーディングを取り出す"""
+    encodings = []
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            encodings.append(name.strip().lower())
+    return encodings
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    クライアントが受け付けるエンコーディングから使うものを選ぶ（brotliを優先）
+    """
+    encodings = _accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in encodings:
+        return "br"
+    if "gzip" in encodings or "*" in encodings:
+        return "gzip"
+    return None
+
+class _Compressor:
+    """gzip / brotli の逐次圧縮"""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=min(level, 11))
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+class CompressionMiddleware:
+    """
+    レスポンスをgzip / brotliで圧縮するASGIミドルウェア
+
+    - Accept-Encodingに応じてエンコーディングを選ぶ（brotliがインストールされていれば優先）
+    - minimum_size未満の小さなレスポンスや、JSON・テキスト以外は圧縮しない
+    - ストリーミングのレスポンスはチャンクごとに逐次圧縮する
+    - 圧縮の対象になり得るレスポンスには、圧縮しなかった場合もVary: Accept-Encodingを付ける
+      （共有キャッシュが別のエンコーディングのレスポンスを返さないようにする）
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, level: int = 6):
+        """
+        Args:
+            app: ラップするASGIアプリケーション
+            minimum_size (int): 圧縮する最小サイズ（バイト）
+            level (int): 圧縮レベル
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(send, encoding, self.minimum_size, self.level)
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    """1つのレスポンスについて、ヘッダーと本文を見て圧縮するかを決める"""
+
+    def __init__(self, send: Send, encoding: Optional[str], minimum_size: int, level: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.level = level
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        # Trueの場合は圧縮せずにそのまま流す
+        self.passthrough = False
+        # 圧縮の対象になり得るレスポンスか（Varyを付けるかどうか）
+        self.compressible = False
+
+    def _should_compress(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _start_headers(self) -> Tuple[Message, MutableHeaders]:
+        message = self.start_message
+        headers = MutableHeaders(raw=message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        return message, headers
+
+    async def _send_start(self) -> None:
+        """保留していたレスポンスヘッダーを圧縮せずに送る"""
+        if self.start_message is None:
+            return
+        if self.compressible:
+            MutableHeaders(raw=self.start_message["headers"]).add_vary_header("Accept-Encoding")
+        await self._send(self.start_message)
+        self.start_message = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # 本文の最初のチャンクを見るまで送信を保留する
+            self.start_message = message
+            self.compressible = self._should_compress(Headers(raw=message["headers"]))
+            self.passthrough = self.encoding is None or not self.compressible
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough:
+            await self._send_start()
+            await self._send(message)
+            return
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                # 小さなレスポンスは圧縮せずにそのまま返す
+                self.passthrough = True
+                await self._send_start()
+                await self._send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding, self.level)
+            start, headers = self._start_headers()
+            if more_body:
+                # ストリーミングでは最終的な長さが分からない
+                del headers["Content-Length"]
+                data = self.compressor.compress(body)
+            else:
+                data = self.compressor.compress(body) + self.compressor.flush()
+                headers["Content-Length"] = str(len(data))
+            await self._send(start)
+            self.start_message = None
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.flush()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
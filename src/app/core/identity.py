@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.cache import TTLCache
+from app.core.security import security_manager
+from app.db.database import get_db
+from app.models.balance import Balance
+from app.models.user import Settings, User
+
+# ユーザー設定のキャッシュ（ユーザーIDがキー。更新のコミット後に破棄する）
+settings_cache = TTLCache(maxsize=4096, ttl=60, name="user_settings")
+
+# コミット後にキャッシュを破棄するユーザーIDを保持する Session.info のキー
+_PENDING_INVALIDATIONS = "identity_settings_invalidations"
+
+@dataclass
+class Identity:
+    """
+    リクエスト中に使い回すユーザー情報
+
+    user・balanceはリクエストのセッション（get_db）に属するインスタンスのため、
+    同じリクエストの中ではそのまま更新できる
+    """
+    user: User
+    settings: Optional[Dict[str, Any]]
+    balance: Optional[Balance]
+
+    @property
+    def user_id(self) -> int:
+        return self.user.id
+
+def load_identity(db: Session, user_id: int) -> Optional[Identity]:
+    """
+    ユーザー・設定・残高を1回の結合クエリで取得する
+
+    設定がキャッシュにある場合は設定の結合を省く
+
+    Returns:
+        Optional[Identity]: ユーザーが存在しない場合はNone
+    """
+    cached_settings = settings_cache.get(user_id)
+    if cached_settings is not None:
+        row = db.query(User, Balance)\
+            .outerjoin(Balance, Balance.user_id == User.id)\
+            .filter(User.id == user_id)\
+            .first()
+        if row is None:
+            return None
+        user, balance = row
+        settings = cached_settings
+    else:
+        row = db.query(User, Settings, Balance)\
+            .outerjoin(Settings, Settings.user_id == User.id)\
+            .outerjoin(Balance, Balance.user_id == User.id)\
+            .filter(User.id == user_id)\
+            .first()
+        if row is None:
+            return None
+        user, settings_row, balance = row
+        settings = settings_row.dict if settings_row is not None else None
+        if settings is not None:
+            settings_cache.set(user_id, settings)
+
+    return Identity(user=user, settings=settings, balance=balance)
+
+def get_identity(
+    request: Request,
+    token_user: dict = Depends(security_manager.get_current_user),
+    db: Session = Depends(get_db)
+) -> Identity:
+    """
+    現在のユーザーの情報を取得する（FastAPIの依存関係として使う）
+
+    クエリを実行するため同期関数とし、FastAPIのスレッドプールで実行させる。
+    セッションはエンドポイントと同じ get_db のものを使う（リクエスト内で使い回される）。
+    結果はrequest.stateに保持し、同じリクエストの中では再度クエリしない
+    """
+    identity = getattr(request.state, "identity", None)
+    if identity is not None:
+        return identity
+
+    identity = load_identity(db, int(token_user["user_id"]))
+    if identity is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    request.state.identity = identity
+    return identity
+
+def invalidate_settings(user_id: int) -> None:
+    """
+    ユーザー設定のキャッシュを破棄する
+    """
+    settings_cache.invalidate(user_id)
+
+@event.listens_for(Settings, "after_update")
+@event.listens_for(Settings, "after_delete")
+def _collect_settings_change(mapper, connection, target: Settings) -> None:
+    """
+    ORM経由で更新・削除された設定のユーザーIDを記録する
+
+    フラッシュの時点で破棄すると、コミット前に並行したリクエストが古い値を
+    キャッシュし直してしまうため、破棄はコミット後に行う
+    """
+    session = object_session(target)
+    if session is not None and target.user_id is not None:
+        session.info.setdefault(_PENDING_INVALIDATIONS, set()).add(target.user_id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_settings_after_commit(session: Session) -> None:
+    """コミットされた設定の変更についてキャッシュを破棄する"""
+    for user_id in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        invalidate_settings(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_settings_changes(session: Session) -> None:
+    """ロールバックされた変更はキャッシュに影響しないため、記録を捨てる"""
+    session.info.pop(_PENDING_INVALIDATIONS, None)
@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, Optional, Tuple
+import hashlib
+import logging
+import os
+import tempfile
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.task_manager import ExecutionMode, task_manager
+
+logger = logging.getLogger(__name__)
+
+# 先頭バイト（マジックナンバー）と画像タイプの対応
+IMAGE_SIGNATURES: Tuple[Tuple[bytes, str], ...] = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+# 判定に必要な先頭バイト数
+SNIFF_LENGTH = max(len(signature) for signature, _ in IMAGE_SIGNATURES)
+
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+}
+
+class ImageTooLargeError(ValueError):
+    """アップロードされた画像がサイズ上限を超えた場合のエラー"""
+
+class UnsupportedImageError(ValueError):
+    """画像の形式が許可されていない場合のエラー"""
+
+@dataclass
+class StoredImage:
+    """保存した画像の情報"""
+    digest: str
+    content_type: str
+    size: int
+    path: str
+    relative_path: str
+    thumbnail_path: str
+    created: bool
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """
+    先頭バイトから画像タイプを判定する（クライアントが申告するContent-Typeは信用しない）
+    """
+    for signature, content_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+def _relative_path(digest: str, content_type: str, suffix: str = "") -> str:
+    """ハッシュの先頭2文字でディレクトリを分けた保存先の相対パス"""
+    return os.path.join(digest[:2], f"{digest}{suffix}{EXTENSIONS[content_type]}")
+
+async def save_image_stream(
+    chunks: AsyncIterator[bytes],
+    upload_dir: str,
+    max_size: int,
+    allowed_types: Iterable[str]
+) -> StoredImage:
+    """
+    受信したチャンクを順にディスクへ書き出しながら画像を保存する
+
+    ファイル全体をメモリに載せず、サイズ上限を超えた時点で受信を打ち切る。
+    保存先は内容のSHA-256で決まるため、同じ画像は1つのファイルにまとまる
+
+    Args:
+        chunks: リクエストボディのチャンク
+        upload_dir (str): 保存先のディレクトリ
+        max_size (int): 最大サイズ（バイト）
+        allowed_types: 許可する画像タイプ
+
+    Returns:
+        StoredImage: 保存した画像の情報
+
+    Raises:
+        ImageTooLargeError: サイズ上限を超えた場合
+        UnsupportedImageError: 許可されていない形式の場合
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=upload_dir, suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    content_type: Optional[str] = None
+
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > max_size:
+                    raise ImageTooLargeError(f"Image exceeds {max_size} bytes")
+
+                if content_type is None:
+                    head = (head + chunk)[:SNIFF_LENGTH]
+                    if len(head) >= SNIFF_LENGTH:
+                        content_type = sniff_image_type(head)
+                        if content_type not in allowed_types:
+                            raise UnsupportedImageError("Unsupported image type")
+
+                digest.update(chunk)
+                await run_in_threadpool(temp_file.write, chunk)
+
+        if content_type is None:
+            # 判定に必要なバイト数に満たない小さなファイル
+            content_type = sniff_image_type(head)
+            if content_type not in allowed_types:
+                raise UnsupportedImageError("Unsupported image type")
+
+        hex_digest = digest.hexdigest()
+        relative_path = _relative_path(hex_digest, content_type)
+        path = os.path.join(upload_dir, relative_path)
+        created = not os.path.exists(path)
+        if created:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp_path, path)
+        else:
+            os.remove(temp_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return StoredImage(
+        digest=hex_digest,
+        content_type=content_type,
+        size=size,
+        path=path,
+        relative_path=relative_path,
+        thumbnail_path=os.path.join(upload_dir, _relative_path(hex_digest, content_type, "_thumb")),
+        created=created
+    )
+
+def make_thumbnail(source_path: str, dest_path: str, size: Tuple[int, int]) -> Optional[str]:
+    """
+    サムネイルを作成する（プロセスプールで実行するためモジュールレベルに置く）
+
+    Pillowがインストールされていない場合は何もしない
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        logger.warning("Pillow is not installed; skipped thumbnail generation")
+        return None
+
+    if os.path.exists(dest_path):
+        return dest_path
+    with Image.open(source_path) as image:
+        image.thumbnail(size)
+        temp_path = f"{dest_path}.part"
+        image.save(temp_path, format=image.format)
+    os.replace(temp_path, dest_path)
+    return dest_path
+
+async def generate_thumbnail(image: StoredImage, size: Tuple[int, int]) -> None:
+    """
+    サムネイルの作成をプロセスプールに投入する（リクエストの処理後に実行する）
+    """
+    if os.path.exists(image.thumbnail_path):
+        return
+
+    task_id = f"thumbnail:{image.digest}"
+    try:
+        await task_manager.add_task(
+            task_id,
+            "wishlist_thumbnail",
+            make_thumbnail,
+            image.path,
+            image.thumbnail_path,
+            size,
+            mode=ExecutionMode.PROCESS
+        )
+    except ValueError:
+        # 同じ画像のサムネイルを作成中
+        return
+    await task_manager.execute_task(task_id)
@@ -0,0 +1,236 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import heapq
+import itertools
+import logging
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class JobStatus:
+    """永続ジョブの状態"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+@dataclass
+class Job:
+    """ワーカーが取得したジョブ"""
+    job_id: str
+    name: str
+    args: List[Any] = field(default_factory=list)
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    max_attempts: int = 3
+    status: str = JobStatus.PENDING
+    result: Any = None
+    error: Optional[str] = None
+
+class JobStore(ABC):
+    """
+    ジョブの永続化先を表す基底クラス
+
+    DBに永続化する実装は app.core.sql_job_store.SQLJobStore（DB接続が不要な場合に読み込まないよう別モジュールにしている）
+
+    ワーカーはリース（一定時間の占有権）付きでジョブを取得する。
+    リースが切れたジョブは、ワーカーがクラッシュしたものとみなして再取得される
+    """
+
+    def __init__(
+        self,
+        retry_base_seconds: float = 5.0,
+        retry_max_seconds: float = 3600.0
+    ):
+        """
+        Args:
+            retry_base_seconds (float): 再試行までの初回待機時間（秒）
+            retry_max_seconds (float): 再試行までの最大待機時間（秒）
+        """
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+    def backoff(self, attempts: int) -> timedelta:
+        """
+        試行回数に応じた指数バックオフの待機時間を返す
+        """
+        delay = self.retry_base_seconds * (2 ** max(attempts - 1, 0))
+        return timedelta(seconds=min(delay, self.retry_max_seconds))
+
+    @abstractmethod
+    def enqueue(
+        self,
+        name: str,
+        args: Optional[List[Any]] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+        max_attempts: int = 3,
+        run_after: Optional[datetime] = None,
+        job_id: Optional[str] = None
+    ) -> str:
+        """ジョブを登録し、ジョブIDを返す"""
+
+    @abstractmethod
+    def claim(self, worker_id: str, limit: int, lease_seconds: float) -> List[Job]:
+        """実行可能なジョブを最大limit件までリース付きで取得する"""
+
+    @abstractmethod
+    def extend_lease(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """実行中ジョブのリースを延長する（他ワーカーに奪われていた場合False）"""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Any = None) -> None:
+        """ジョブを完了状態にする"""
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        """ジョブの失敗を記録し、試行回数が残っていれば再試行を予約する"""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """ジョブを取得する"""
+
+class InMemoryJobStore(JobStore):
+    """
+    プロセス内のみで完結するジョブストア
+
+    開発環境や単一ワーカー構成向け。再起動するとジョブは失われる。
+    実行待ちのジョブは実行可能時刻順のヒープ、実行中のジョブはリース期限順のヒープで持つため、
+    claimは取得件数に比例した時間で終わる。
+    完了・失敗したジョブは実行待ちの管理から外し、直近のmax_finished件だけをgetのために残す
+    """
+
+    def __init__(self, max_finished: int = 1000, **kwargs):
+        """
+        Args:
+            max_finished (int): getで参照できるよう保持する完了・失敗済みジョブの最大件数
+        """
+        super().__init__(**kwargs)
+        self.max_finished = max_finished
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._finished: "OrderedDict[str, Job]" = OrderedDict()
+        # (実行可能時刻, 連番, ジョブID)。連番がエントリの ready_seq と異なるものは古いエントリ
+        self._ready: List[Tuple[datetime, int, str]] = []
+        # (リース期限, 連番, ジョブID)。連番がエントリの lease_seq と異なるものは古いエントリ
+        self._leases: List[Tuple[datetime, int, str]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _push_ready(self, job_id: str, entry: Dict[str, Any]) -> None:
+        entry["ready_seq"] = seq = next(self._seq)
+        heapq.heappush(self._ready, (entry["run_after"], seq, job_id))
+
+    def _finish(self, job_id: str) -> None:
+        """完了・失敗したジョブを実行待ちの管理から外す"""
+        entry = self._jobs.pop(job_id)
+        self._finished[job_id] = entry["job"]
+        while len(self._finished) > self.max_finished:
+            self._finished.popitem(last=False)
+
+    def _expire_leases(self, now: datetime) -> None:
+        """リースが切れた実行中ジョブを再取得できるようにする（試行回数を使い切ったものは失敗扱い）"""
+        while self._leases and self._leases[0][0] <= now:
+            _, seq, job_id = heapq.heappop(self._leases)
+            entry = self._jobs.get(job_id)
+            if entry is None or entry["lease_seq"] != seq or entry["job"].status != JobStatus.RUNNING:
+                continue
+            if entry["lease_expires_at"] > now:
+                # extend_leaseで延長されていた場合は新しい期限で入れ直す
+                heapq.heappush(self._leases, (entry["lease_expires_at"], seq, job_id))
+                continue
+            job = entry["job"]
+            if job.attempts >= job.max_attempts:
+                job.status = JobStatus.FAILED
+                job.error = job.error or "lease expired"
+                self._finish(job_id)
+                continue
+            self._push_ready(job_id, entry)
+
+    def enqueue(self, name, args=None, kwargs=None, max_attempts=3, run_after=None, job_id=None) -> str:
+        job_id = job_id or str(uuid.uuid4())
+        with self._lock:
+            if job_id in self._jobs or job_id in self._finished:
+                raise ValueError(f"Job with ID {job_id} already exists")
+            entry = self._jobs[job_id] = {
+                "job": Job(job_id, name, list(args or []), dict(kwargs or {}),
+                           max_attempts=max_attempts),
+                "run_after": run_after or datetime.utcnow(),
+                "locked_by": None,
+                "lease_expires_at": None,
+                "ready_seq": None,
+                "lease_seq": None,
+            }
+            self._push_ready(job_id, entry)
+        return job_id
+
+    def claim(self, worker_id, limit, lease_seconds) -> List[Job]:
+        now = datetime.utcnow()
+        claimed = []
+        with self._lock:
+            self._expire_leases(now)
+            while self._ready and len(claimed) < limit and self._ready[0][0] <= now:
+                _, seq, job_id = heapq.heappop(self._ready)
+                entry = self._jobs.get(job_id)
+                if entry is None or entry["ready_seq"] != seq:
+                    continue
+                entry["ready_seq"] = None
+                job = entry["job"]
+                expired = (
+                    job.status == JobStatus.RUNNING
+                    and entry["lease_expires_at"] <= now
+                )
+                if not (job.status == JobStatus.PENDING or expired):
+                    # リース切れの後に元のワーカーがリースを延長していた場合
+                    continue
+                job.status = JobStatus.RUNNING
+                job.attempts += 1
+                entry["locked_by"] = worker_id
+                entry["lease_expires_at"] = now + timedelta(seconds=lease_seconds)
+                entry["lease_seq"] = lease_seq = next(self._seq)
+                heapq.heappush(self._leases, (entry["lease_expires_at"], lease_seq, job_id))
+                claimed.append(job)
+        return claimed
+
+    def extend_lease(self, job_id, worker_id, lease_seconds) -> bool:
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if not entry or entry["locked_by"] != worker_id:
+                return False
+            entry["lease_expires_at"] = datetime.utcnow() + timedelta(seconds=lease_seconds)
+            return True
+
+    def complete(self, job_id, worker_id, result=None) -> None:
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if not entry or entry["locked_by"] != worker_id:
+                return
+            entry["job"].status = JobStatus.COMPLETED
+            entry["job"].result = result
+            entry["locked_by"] = None
+            self._finish(job_id)
+
+    def fail(self, job_id, worker_id, error) -> None:
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if not entry or entry["locked_by"] != worker_id:
+                return
+            job = entry["job"]
+            job.error = error
+            entry["locked_by"] = None
+            if job.attempts < job.max_attempts:
+                job.status = JobStatus.PENDING
+                entry["run_after"] = datetime.utcnow() + self.backoff(job.attempts)
+                self._push_ready(job_id, entry)
+            else:
+                job.status = JobStatus.FAILED
+                self._finish(job_id)
+
+    def get(self, job_id) -> Optional[Job]:
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry:
+                return entry["job"]
+            return self._finished.get(job_id)
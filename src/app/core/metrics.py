@@ -0,0 +1,325 @@
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import threading
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# 既定のバケット境界（秒）。数ミリ秒〜数分の処理を想定
+DEFAULT_BUCKETS: Sequence[float] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0
+)
+
+class Histogram:
+    """
+    固定バケットのヒストグラム
+
+    観測値そのものは保持せず、バケットごとの件数と合計のみを持つため
+    観測回数に関係なくメモリ使用量は一定
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Args:
+            buckets: バケットの上限値（昇順）
+        """
+        self.buckets: List[float] = sorted(buckets)
+        # 最後の要素は上限なし（+Inf）のバケット
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """値を記録する"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        バケットから分位点を推定する（該当バケット内で線形補間）
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """件数・平均・分位点とバケットごとの累積件数を返す"""
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets + [float("inf")], self.counts):
+            cumulative += bucket_count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+    def cumulative_counts(self) -> List[Tuple[float, int]]:
+        """バケットの上限値と累積件数の組（最後は +Inf）"""
+        with self._lock:
+            counts = list(self.counts)
+        cumulative = 0
+        result = []
+        for bound, bucket_count in zip(self.buckets + [float("inf")], counts):
+            cumulative += bucket_count
+            result.append((bound, cumulative))
+        return result
+
+class Counter:
+    """単調増加するカウンター"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+class Gauge:
+    """増減する現在値"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+
+class MetricFamily:
+    """
+    同じ名前でラベルの値ごとに分かれたメトリクス
+
+    labels() でラベルの値に対応する Counter / Gauge / Histogram を取得する
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        metric_type: str,
+        labelnames: Sequence[str],
+        factory: Callable[[], Any]
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.type = metric_type
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: Any) -> Any:
+        """ラベルの値に対応するメトリクス（なければ作る）"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._factory())
+        return child
+
+    def children(self) -> List[Tuple[Dict[str, str], Any]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+
+# コレクターが返すメトリクス: (名前, 種類, 説明, [(ラベル, 値), ...])
+CollectedMetric = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label(str(value))}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+class MetricsRegistry:
+    """
+    アプリケーションのメトリクスを集め、Prometheusのテキスト形式で出力する
+
+    - counter / gauge / histogram で登録したメトリクスは記録した値をそのまま出力する
+    - DBのコネクションプールやキャッシュのように、出力時に値を読むものはコレクターとして登録する
+    """
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._collectors: List[Callable[[], Iterable[CollectedMetric]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, family: MetricFamily) -> MetricFamily:
+        with self._lock:
+            existing = self._families.get(family.name)
+            if existing is not None:
+                if existing.type != family.type or existing.labelnames != family.labelnames:
+                    raise ValueError(f"Metric {family.name} is already registered")
+                return existing
+            self._families[family.name] = family
+            return family
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        """カウンターを登録する（同じ名前で登録済みの場合はそれを返す）"""
+        return self._register(MetricFamily(name, documentation, "counter", labelnames, Counter))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        """ゲージを登録する（同じ名前で登録済みの場合はそれを返す）"""
+        return self._register(MetricFamily(name, documentation, "gauge", labelnames, Gauge))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> MetricFamily:
+        """ヒストグラムを登録する（同じ名前で登録済みの場合はそれを返す）"""
+        return self._register(
+            MetricFamily(name, documentation, "histogram", labelnames, lambda: Histogram(buckets))
+        )
+
+    def register_collector(self, collector: Callable[[], Iterable[CollectedMetric]]) -> None:
+        """
+        出力時に呼び出すコレクターを登録する
+
+        Args:
+            collector: (名前, 種類, 説明, [(ラベル, 値), ...]) を返す関数
+        """
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheusのテキスト形式（text/plain; version=0.0.4）で出力する"""
+        with self._lock:
+            families = list(self._families.values())
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for labels, child in family.children():
+                if family.type == "histogram":
+                    for bound, cumulative in child.cumulative_counts():
+                        bucket_labels = {**labels, "le": _format_value(bound)}
+                        lines.append(f"{family.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                    lines.append(f"{family.name}_sum{_format_labels(labels)} {_format_value(child.sum)}")
+                    lines.append(f"{family.name}_count{_format_labels(labels)} {child.count}")
+                else:
+                    lines.append(f"{family.name}{_format_labels(labels)} {_format_value(child.value)}")
+
+        for collector in collectors:
+            try:
+                collected = list(collector())
+            except Exception:
+                # 1つのコレクターの失敗で出力全体を失わないようにする
+                continue
+            for name, metric_type, documentation, samples in collected:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+metrics_registry = MetricsRegistry()
+
+# ルートが見つからなかったリクエストのラベル（パスをそのまま使うとラベルが際限なく増えるため）
+UNMATCHED_ROUTE = "<unmatched>"
+
+def _route_label(scope: Scope) -> str:
+    """ルーティング後のパスのテンプレート（例: /api/v1/wishlist/{item_id}/image）"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+class MetricsMiddleware:
+    """
+    ルートごとのリクエスト数・レイテンシ・処理中のリクエスト数を記録するASGIミドルウェア
+
+    ルートはルーティングが終わるまで決まらないため、処理中のリクエスト数はメソッドごとに数え、
+    リクエスト数とレイテンシはレスポンス後にルートのテンプレートごとに記録する
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics_registry):
+        self.app = app
+        self.requests = registry.counter(
+            "http_requests_total",
+            "Total HTTP requests by route and status",
+            ("method", "route", "status")
+        )
+        self.latency = registry.histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route",
+            ("method", "route")
+        )
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight",
+            "HTTP requests currently being processed",
+            ("method",)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "")
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = self.in_flight.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.dec()
+            route = _route_label(scope)
+            self.requests.labels(method, route, status_code).inc()
+            self.latency.labels(method, route).observe(elapsed)
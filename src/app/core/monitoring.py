@@ -0,0 +1,94 @@
+from collections import Counter
+from typing import Dict, Iterable
+
+from app.core.cache import all_caches
+from app.core.db_manager import DatabaseManager, db_manager
+from app.core.metrics import CollectedMetric, MetricsRegistry, metrics_registry
+from app.core.task_manager import TaskManager, task_manager
+
+# background_tasks_total の task ラベルの最大数（超えた分は OTHER_TASKS にまとめる）
+MAX_TASK_LABELS = 50
+OTHER_TASKS = "<other>"
+
+def task_label(name: str) -> str:
+    """
+    タスク名をメトリクスのラベルにする
+
+    スケジューラーはスケジュールIDをタスク名に使うため、「種類:詳細」の形の名前は
+    種類ごとにまとめる（ユーザーごとのIDでラベルが際限なく増えないようにする）
+    """
+    return name.partition(":")[0]
+
+def collect_database(db: DatabaseManager = db_manager) -> Iterable[CollectedMetric]:
+    """コネクションプールの使用状況と直近のヘルスチェックの結果"""
+    pool = db.pool_stats()
+    yield (
+        "db_pool_connections",
+        "gauge",
+        "Database connection pool usage",
+        [({"state": state}, value) for state, value in pool.items()],
+    )
+    yield (
+        "db_up",
+        "gauge",
+        "Whether the last database health check succeeded",
+        [({}, 1 if db.health_check() else 0)],
+    )
+
+def collect_caches() -> Iterable[CollectedMetric]:
+    """TTLCacheごとの件数・ヒット・ミス・破棄数"""
+    caches = [cache.stats() for cache in all_caches()]
+    for key, metric_type, documentation in (
+        ("size", "gauge", "Entries currently held in the cache"),
+        ("hits", "counter", "Cache hits"),
+        ("misses", "counter", "Cache misses"),
+        ("evictions", "counter", "Entries evicted because the cache was full"),
+    ):
+        name = f"cache_{key}" if metric_type == "gauge" else f"cache_{key}_total"
+        yield (
+            name,
+            metric_type,
+            documentation,
+            [({"cache": stats["name"] or "unnamed"}, stats[key]) for stats in caches],
+        )
+
+def collect_tasks(manager: TaskManager = task_manager) -> Iterable[CollectedMetric]:
+    """バックグラウンドタスクの実行中・待機中の件数と結果ごとの件数"""
+    stats = manager.get_stats()
+    yield (
+        "background_tasks_in_flight",
+        "gauge",
+        "Background tasks currently running",
+        [({"mode": mode}, count) for mode, count in stats["in_flight"].items()],
+    )
+    yield (
+        "background_tasks_pending",
+        "gauge",
+        "Background tasks waiting to run",
+        [({}, stats["pending"])],
+    )
+    totals: Dict[str, Counter] = {}
+    for name, task_stats in stats["tasks"].items():
+        label = task_label(name)
+        if label not in totals and len(totals) >= MAX_TASK_LABELS:
+            label = OTHER_TASKS
+        counts = totals.setdefault(label, Counter())
+        for outcome in ("succeeded", "failed", "cancelled"):
+            counts[outcome] += task_stats[outcome]
+    samples = [
+        ({"task": label, "outcome": outcome}, counts[outcome])
+        for label, counts in sorted(totals.items())
+        for outcome in ("succeeded", "failed", "cancelled")
+    ]
+    yield (
+        "background_tasks_total",
+        "counter",
+        "Finished background tasks by outcome",
+        samples,
+    )
+
+def register_default_collectors(registry: MetricsRegistry = metrics_registry) -> None:
+    """DB・キャッシュ・バックグラウンドタスクのコレクターを登録する"""
+    registry.register_collector(collect_database)
+    registry.register_collector(collect_caches)
+    registry.register_collector(collect_tasks)
@@ -0,0 +1,279 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.db_manager import DatabaseManager, db_manager
+from app.models.balance import TransactionKey
+
+logger = logging.getLogger(__name__)
+
+# パーティションの作成・切り離し（毎日 3:30）
+PARTITION_MAINTENANCE_SCHEDULE = "30 3 * * *"
+
+@dataclass
+class PartitionConfig:
+    """
+    取引テーブルのパーティション構成
+
+    created_atで月単位にレンジパーティション化し、hash_partitionsを指定した場合は
+    各月をさらにuser_idでハッシュパーティション化する
+    """
+    table: str = "transactions"
+    column: str = "created_at"
+    # 各月をuser_idで分割する数（0の場合は分割しない）
+    hash_partitions: int = 0
+    # 何か月先までパーティションを作っておくか
+    premake_months: int = 3
+    # 何か月より前のパーティションを切り離すか（Noneの場合は切り離さない）
+    retention_months: Optional[int] = None
+    # 切り離したパーティションの移動先スキーマ（Noneの場合は移動しない）
+    archive_schema: Optional[str] = "archive"
+
+def month_start(value: date) -> date:
+    """月初の日付"""
+    return date(value.year, value.month, 1)
+
+def add_months(value: date, months: int) -> date:
+    """月初の日付にmonthsか月を足す"""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(config: PartitionConfig, month: date) -> str:
+    """月のパーティション名（例: transactions_y2024m01）"""
+    return f"{config.table}_y{month.year:04d}m{month.month:02d}"
+
+def _parse_partition_month(config: PartitionConfig, name: str) -> Optional[date]:
+    """パーティション名から月を取り出す（ハッシュ分割の子パーティションは対象外）"""
+    match = re.fullmatch(rf"{re.escape(config.table)}_y(\d{{4}})m(\d{{2}})", name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+def create_partition_statements(config: PartitionConfig, month: date) -> List[str]:
+    """
+    1か月分のパーティション（とハッシュ分割の子パーティション）を作成するSQL
+    """
+    name = partition_name(config, month)
+    sub_partition = f" PARTITION BY HASH (user_id)" if config.hash_partitions else ""
+    statements = [
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {config.table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        f"{sub_partition}"
+    ]
+    for remainder in range(config.hash_partitions):
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {name}_h{remainder} PARTITION OF {name} "
+            f"FOR VALUES WITH (MODULUS {config.hash_partitions}, REMAINDER {remainder})"
+        )
+    return statements
+
+def list_partitions(connection: Connection, config: PartitionConfig) -> List[Tuple[str, date]]:
+    """
+    取引テーブルに接続されている月のパーティションを古い順に返す
+    """
+    rows = connection.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :table"
+    ), {"table": config.table}).scalars().all()
+    partitions = []
+    for name in rows:
+        month = _parse_partition_month(config, name)
+        if month is not None:
+            partitions.append((name, month))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def is_partitioned(connection: Connection, config: PartitionConfig) -> bool:
+    """取引テーブルがパーティション化済みか"""
+    return bool(connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table "
+        "JOIN pg_class ON pg_class.oid = pg_partitioned_table.partrelid "
+        "WHERE pg_class.relname = :table"
+    ), {"table": config.table}).scalar())
+
+def migrate_to_partitioned(
+    config: PartitionConfig = PartitionConfig(),
+    db: DatabaseManager = db_manager,
+    today: Optional[date] = None
+) -> List[str]:
+    """
+    既存の取引テーブルをパーティション化したテーブルに移行する（PostgreSQLのみ）
+
+    1. 既存のテーブルを <table>_legacy に改名する
+    2. 同じ列・既定値で PARTITION BY RANGE (created_at) のテーブルを作る
+       （idの採番は既存のシーケンスを引き継ぐ）
+    3. 既存データの最古の月から premake_months か月先までのパーティションを作る
+    4. データと冪等キーを移し、旧テーブルを削除する
+    5. 主キー (id, created_at)・外部キー・インデックスを作る
+
+    すべて1つのトランザクションで行うため、途中で失敗した場合は元の状態に戻る。
+    移行中は取引テーブルへの書き込みがロックされる
+
+    Returns:
+        List[str]: 作成したパーティション名
+    """
+    today = today or date.today()
+    legacy = f"{config.table}_legacy"
+    with db.engine.begin() as connection:
+        if connection.dialect.name != "postgresql":
+            raise RuntimeError("Table partitioning is only supported on PostgreSQL")
+        if is_partitioned(connection, config):
+            logger.info(f"{config.table} is already partitioned")
+            return []
+
+        oldest = connection.execute(
+            text(f"SELECT min({config.column}) FROM {config.table}")
+        ).scalar()
+        sequence = connection.execute(
+            text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": config.table}
+        ).scalar()
+
+        connection.execute(text(f"ALTER TABLE {config.table} RENAME TO {legacy}"))
+        connection.execute(text(
+            f"CREATE TABLE {config.table} "
+            f"(LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE ({config.column})"
+        ))
+        first_month = month_start(oldest.date() if oldest else today)
+        last_month = add_months(month_start(today), config.premake_months)
+        created = []
+        month = first_month
+        while month <= last_month:
+            for statement in create_partition_statements(config, month):
+                connection.execute(text(statement))
+            created.append(partition_name(config, month))
+            month = add_months(month, 1)
+
+        # created_atがない行はどのパーティションにも入らないため、移行前に埋める
+        connection.execute(text(
+            f"UPDATE {legacy} SET {config.column} = now() WHERE {config.column} IS NULL"
+        ))
+        connection.execute(text(f"INSERT INTO {config.table} SELECT * FROM {legacy}"))
+
+        # 冪等キーの一意性はパーティション化後は別テーブルで保証する
+        TransactionKey.__table__.create(connection, checkfirst=True)
+        connection.execute(text(
+            f"INSERT INTO {TransactionKey.__tablename__} "
+            f"(idempotency_key, user_id, transaction_id, transaction_created_at) "
+            f"SELECT idempotency_key, user_id, id, {config.column} FROM {legacy} "
+            f"WHERE idempotency_key IS NOT NULL ON CONFLICT DO NOTHING"
+        ))
+
+        if sequence:
+            connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {config.table}.id"))
+        # 旧テーブルの主キー・インデックスと名前が重なるため、削除してから作る
+        connection.execute(text(f"DROP TABLE {legacy}"))
+
+        connection.execute(text(
+            f"ALTER TABLE {config.table} ADD PRIMARY KEY (id, {config.column})"
+        ))
+        connection.execute(text(
+            f"ALTER TABLE {config.table} "
+            f"ADD FOREIGN KEY (balance_id) REFERENCES balances (id), "
+            f"ADD FOREIGN KEY (user_id) REFERENCES users (id)"
+        ))
+        # 履歴・集計用のインデックス（各パーティションに自動で作られる）
+        connection.execute(text(
+            f"CREATE INDEX ix_{config.table}_user_created "
+            f"ON {config.table} (user_id, {config.column})"
+        ))
+
+    logger.info(f"Partitioned {config.table} into {len(created)} monthly partitions")
+    return created
+
+def ensure_future_partitions(
+    connection: Connection,
+    config: PartitionConfig,
+    today: date
+) -> List[str]:
+    """
+    今月から premake_months か月先までのパーティションがなければ作る
+
+    Returns:
+        List[str]: 新しく作成したパーティション名
+    """
+    existing = {name for name, _ in list_partitions(connection, config)}
+    created = []
+    for offset in range(config.premake_months + 1):
+        month = add_months(month_start(today), offset)
+        if partition_name(config, month) in existing:
+            continue
+        for statement in create_partition_statements(config, month):
+            connection.execute(text(statement))
+        created.append(partition_name(config, month))
+    return created
+
+def detach_old_partitions(
+    connection: Connection,
+    config: PartitionConfig,
+    today: date
+) -> List[str]:
+    """
+    保持期間より前のパーティションを切り離し、アーカイブ用のスキーマへ移す
+
+    切り離したテーブルはそのまま残るため、ダンプ・削除は任意のタイミングで行える
+
+    Returns:
+        List[str]: 切り離したパーティション名
+    """
+    if config.retention_months is None:
+        return []
+
+    cutoff = add_months(month_start(today), -config.retention_months)
+    if config.archive_schema:
+        connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {config.archive_schema}"))
+
+    detached = []
+    for name, month in list_partitions(connection, config):
+        if month >= cutoff:
+            break
+        connection.execute(text(f"ALTER TABLE {config.table} DETACH PARTITION {name}"))
+        if config.archive_schema:
+            connection.execute(text(f"ALTER TABLE {name} SET SCHEMA {config.archive_schema}"))
+        detached.append(name)
+    return detached
+
+def maintain_partitions(
+    config: PartitionConfig = PartitionConfig(),
+    db: DatabaseManager = db_manager,
+    today: Optional[date] = None
+) -> Tuple[List[str], List[str]]:
+    """
+    先の月のパーティションを作成し、古い月のパーティションを切り離す（定期実行用）
+
+    パーティション化されていない場合やPostgreSQL以外では何もしない
+
+    Returns:
+        Tuple[List[str], List[str]]: (作成したパーティション名, 切り離したパーティション名)
+    """
+    today = today or datetime.utcnow().date()
+    with db.engine.begin() as connection:
+        if connection.dialect.name != "postgresql" or not is_partitioned(connection, config):
+            return [], []
+        created = ensure_future_partitions(connection, config, today)
+        detached = detach_old_partitions(connection, config, today)
+
+    if created or detached:
+        logger.info(f"Partition maintenance for {config.table}: created {created}, detached {detached}")
+    return created, detached
+
+def register_partition_maintenance(scheduler, config: PartitionConfig = PartitionConfig()) -> None:
+    """
+    パーティションの定期メンテナンスをスケジューラーに登録する
+
+    Args:
+        scheduler (RecurringScheduler): 登録先のスケジューラー
+        config (PartitionConfig): パーティション構成
+    """
+    scheduler.add_schedule(
+        f"partition_maintenance:{config.table}",
+        PARTITION_MAINTENANCE_SCHEDULE,
+        maintain_partitions,
+        config
+    )
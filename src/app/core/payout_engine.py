@@ -0,0 +1,283 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import logging
+import math
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.affordability import invalidate_affordability
+from app.core.db_manager import DatabaseManager, db_manager
+from app.core.payout_periods import expected_occurrences
+from app.core.rollups import apply_postings
+from app.models.balance import Balance, Transaction, TransactionType
+from app.models.task import RegularTask, TaskCompletion, TaskFrequency, WorkPayout
+
+logger = logging.getLogger(__name__)
+
+# 達成率による報酬の支払率（達成率の下限, 支払率）。いずれにも該当しない場合は達成率と同率
+REWARD_TIERS: List[Tuple[float, float]] = [
+    (0.8, 1.0),
+    (0.5, 0.5),
+    (0.2, 0.2),
+]
+
+def payout_ratio(completion_rate: float) -> float:
+    """
+    達成率から報酬の支払率を求める
+
+    80%以上 → 100%、50〜79% → 50%、20〜49% → 20%、20%未満 → 達成率と同率
+    """
+    for threshold, ratio in REWARD_TIERS:
+        if completion_rate >= threshold:
+            return ratio
+    return completion_rate
+
+@dataclass
+class PayoutLine:
+    """ユーザーごとの支払い計算結果"""
+    user_id: int
+    expected_count: int
+    verified_count: int
+    base_reward: int
+    completion_rate: float
+    ratio: float
+    amount: int
+
+@dataclass
+class PayoutSummary:
+    """支払い処理の結果"""
+    period_start: datetime
+    period_end: datetime
+    lines: List[PayoutLine]
+    already_paid: bool = False
+
+    @property
+    def total_amount(self) -> int:
+        return sum(line.amount for line in self.lines)
+
+class WorkPayoutEngine:
+    """
+    お仕事報酬の一括支払いエンジン
+
+    期間内の予定回数と確認済み完了回数を全ユーザー分まとめて1回の集計クエリで求め、
+    支払率を適用したうえで取引・残高をまとめて更新する。
+    支払い記録（work_payouts）は期間ごとに一意なため、同じ期間を再実行しても二重払いにならない
+    """
+
+    def __init__(self, db: DatabaseManager = db_manager):
+        """
+        Args:
+            db (DatabaseManager): データベースマネージャー
+        """
+        self.db = db
+
+    @staticmethod
+    def occurrences(frequency: TaskFrequency, period_start: datetime, period_end: datetime) -> int:
+        """
+        期間内にタスクを実施すべき回数を求める（1周期が期間より長いタスクは0回）
+        """
+        return expected_occurrences(frequency.value, (period_end - period_start).days)
+
+    def _expected_count(self, period_start: datetime, period_end: datetime):
+        """頻度ごとの予定回数をSQLのCASE式にする"""
+        return case(
+            *[
+                (RegularTask.frequency == frequency,
+                 self.occurrences(frequency, period_start, period_end))
+                for frequency in TaskFrequency
+            ],
+            else_=1
+        )
+
+    def aggregate(self, db: Session, period_start: datetime, period_end: datetime) -> List[Tuple[int, int, int, int]]:
+        """
+        未払いのユーザーについて、予定回数・確認済み完了回数・基準報酬額を1回のクエリで集計する
+
+        完了回数はタスクごとに予定回数で頭打ちにしてから合算する（1つのタスクを
+        多くこなしても他のタスクの未達成分は埋まらない）。
+        予定回数が0回のタスク（週次の支払いでの月次タスクなど）は集計に含めない
+
+        Returns:
+            List[Tuple[int, int, int, int]]: (ユーザーID, 予定回数, 確認済み回数, 基準報酬額)
+        """
+        verified = select(
+            TaskCompletion.task_id,
+            func.count(TaskCompletion.id).label("verified")
+        ).where(
+            TaskCompletion.verified.is_(True),
+            TaskCompletion.completed_at >= period_start,
+            TaskCompletion.completed_at < period_end
+        ).group_by(TaskCompletion.task_id).subquery()
+
+        expected = self._expected_count(period_start, period_end)
+        done = func.coalesce(verified.c.verified, 0)
+        capped = case((done > expected, expected), else_=done)
+
+        paid_users = select(WorkPayout.user_id).where(
+            WorkPayout.period_start == period_start,
+            WorkPayout.period_end == period_end
+        )
+
+        query = select(
+            RegularTask.user_id,
+            func.sum(expected),
+            func.sum(capped),
+            func.sum(RegularTask.reward_amount * expected)
+        ).outerjoin(
+            verified, verified.c.task_id == RegularTask.id
+        ).where(
+            RegularTask.is_active.is_(True),
+            RegularTask.created_at < period_end,
+            RegularTask.user_id.notin_(paid_users),
+            expected > 0
+        ).group_by(RegularTask.user_id)
+
+        return [tuple(row) for row in db.execute(query).all()]
+
+    @staticmethod
+    def apply_tiers(rows: List[Tuple[int, int, int, int]]) -> List[PayoutLine]:
+        """
+        集計結果に支払率を一括で適用する（1円未満は切り捨て）
+        """
+        rates = [verified / expected if expected else 0.0 for _, expected, verified, _ in rows]
+        ratios = [payout_ratio(rate) for rate in rates]
+        return [
+            PayoutLine(
+                user_id=user_id,
+                expected_count=int(expected),
+                verified_count=int(verified),
+                base_reward=int(base_reward),
+                completion_rate=rate,
+                ratio=ratio,
+                amount=math.floor(int(base_reward) * ratio)
+            )
+            for (user_id, expected, verified, base_reward), rate, ratio in zip(rows, rates, ratios)
+        ]
+
+    def run(self, period_start: datetime, period_end: datetime) -> PayoutSummary:
+        """
+        期間のお仕事報酬を支払う
+
+        集計・支払い記録・取引の登録・残高の更新を1つのトランザクションで行う
+
+        Args:
+            period_start (datetime): 期間の開始（この時刻を含む）
+            period_end (datetime): 期間の終了（この時刻を含まない）
+
+        Returns:
+            PayoutSummary: 支払い結果
+        """
+        if period_end <= period_start:
+            raise ValueError("period_end must be after period_start")
+
+        try:
+            with self.db.get_db() as db:
+                lines = self.apply_tiers(self.aggregate(db, period_start, period_end))
+                if lines:
+                    self._post(db, lines, period_start, period_end)
+        except IntegrityError:
+            # 並行して同じ期間の支払いが実行された場合は、一意制約により全体がロールバックされる
+            logger.warning(f"Work payout for {period_start}..{period_end} is already being processed")
+            return PayoutSummary(period_start, period_end, [], already_paid=True)
+
+        for line in lines:
+            if line.amount > 0:
+                invalidate_affordability(line.user_id)
+
+        logger.info(
+            f"Work payout for {period_start}..{period_end}: "
+            f"{len(lines)} users, total {sum(line.amount for line in lines)}"
+        )
+        return PayoutSummary(period_start, period_end, lines, already_paid=not lines)
+
+    def _post(self, db: Session, lines: List[PayoutLine], period_start: datetime, period_end: datetime) -> None:
+        """支払い記録・取引・残高をまとめて書き込む"""
+        # 支払い記録は0円でも残し、期間を処理済みにする
+        db.execute(insert(WorkPayout), [
+            {
+                "user_id": line.user_id,
+                "period_start": period_start,
+                "period_end": period_end,
+                "expected_count": line.expected_count,
+                "verified_count": line.verified_count,
+                "base_reward": line.base_reward,
+                "paid_amount": line.amount,
+            }
+            for line in lines
+        ])
+
+        paying = {line.user_id: line.amount for line in lines if line.amount > 0}
+        if not paying:
+            return
+
+        balance_ids = self._balance_ids(db, list(paying))
+        description = f"お仕事報酬 {period_start:%Y-%m-%d}〜{(period_end - timedelta(seconds=1)):%Y-%m-%d}"
+        posted_at = datetime.utcnow()
+        transactions = [
+            {
+                "balance_id": balance_ids[user_id],
+                "user_id": user_id,
+                "amount": amount,
+                "transaction_type": TransactionType.JOB,
+                "description": description,
+                "created_at": posted_at,
+            }
+            for user_id, amount in paying.items()
+        ]
+        db.execute(insert(Transaction), transactions)
+        # まとめて登録した取引はORMのイベントが発生しないため、集計への加算を明示的に行う
+        apply_postings(db.connection(), transactions)
+
+        db.execute(
+            update(Balance)
+            .where(Balance.user_id.in_(list(paying)))
+            .values(
+                current_amount=Balance.current_amount + case(paying, value=Balance.user_id, else_=0),
+                last_updated=datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _balance_ids(db: Session, user_ids: List[int]) -> Dict[int, int]:
+        """ユーザーごとの残高IDを取得し、残高がないユーザーの分は作成する"""
+        rows = db.execute(
+            select(Balance.user_id, Balance.id).where(Balance.user_id.in_(user_ids))
+        ).all()
+        balance_ids = {user_id: balance_id for user_id, balance_id in rows}
+
+        missing = [user_id for user_id in user_ids if user_id not in balance_ids]
+        if missing:
+            db.execute(insert(Balance), [
+                {"user_id": user_id, "current_amount": 0.0} for user_id in missing
+            ])
+            rows = db.execute(
+                select(Balance.user_id, Balance.id).where(Balance.user_id.in_(missing))
+            ).all()
+            balance_ids.update({user_id: balance_id for user_id, balance_id in rows})
+
+        return balance_ids
+
+    def run_previous_period(self, frequency: str, now: Optional[datetime] = None) -> PayoutSummary:
+        """
+        直前の1期間分を支払う（スケジューラーからの定期実行用）
+
+        週次は直前の7日間、月次は前月1か月分を対象にする
+
+        Args:
+            frequency (str): weekly / monthly
+            now (Optional[datetime]): 基準時刻（UTC、未指定時は現在時刻）
+        """
+        now = now or datetime.utcnow()
+        period_end = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if frequency == "weekly":
+            period_start = period_end - timedelta(days=7)
+        elif frequency == "monthly":
+            period_end = period_end.replace(day=1)
+            period_start = (period_end - timedelta(days=1)).replace(day=1)
+        else:
+            raise ValueError(f"Unsupported payout frequency: {frequency}")
+        return self.run(period_start, period_end)
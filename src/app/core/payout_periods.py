@@ -0,0 +1,33 @@
+# お仕事報酬の予定回数の計算（モデルに依存せず、DBなしで読み込める）
+
+# 頻度（TaskFrequencyの値）ごとの1周期の最短日数
+FREQUENCY_MIN_DAYS = {
+    "daily": 1,
+    "weekly": 7,
+    "monthly": 28,
+}
+
+def expected_occurrences(frequency: str, days: int) -> int:
+    """
+    期間内にタスクを実施すべき回数を求める
+
+    1周期が期間より長いタスク（7日間の支払いでの月次タスクなど）は0回とし、
+    その期間の予定回数・基準報酬額・達成率に含めない
+
+    Args:
+        frequency (str): タスクの頻度（daily / weekly / monthly / one_time）
+        days (int): 期間の日数
+
+    Returns:
+        int: 予定回数
+    """
+    days = max(days, 1)
+    if frequency not in FREQUENCY_MIN_DAYS:
+        return 1
+    if days < FREQUENCY_MIN_DAYS[frequency]:
+        return 0
+    if frequency == "daily":
+        return days
+    if frequency == "weekly":
+        return days // 7
+    return max(round(days / 30), 1)
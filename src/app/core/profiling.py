@@ -0,0 +1,258 @@
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.metrics import UNMATCHED_ROUTE
+
+# 全リクエストのうちプロファイルを取る割合（0の場合は署名付きヘッダーのリクエストのみ）
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# デバッグヘッダーの署名に使う秘密鍵（未設定の場合はヘッダーによるプロファイルと管理APIを無効にする）
+PROFILING_SECRET = os.getenv("PROFILING_SECRET")
+# スタックを採取する間隔（ミリ秒）
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+DEBUG_HEADER = "X-Debug-Profile"
+
+# 1つのルートで保持するスタックの種類の上限（超えた分は1つにまとめる）
+MAX_STACKS_PER_ROUTE = 5000
+# 1つのスタックで記録する深さの上限
+MAX_STACK_DEPTH = 128
+
+def sign_debug_token(secret: str, ttl_seconds: int = 300) -> str:
+    """
+    デバッグヘッダーに付ける署名付きトークンを作る（有効期限付き）
+
+    Returns:
+        str: "<有効期限のUNIX時刻>:<HMAC-SHA256>"
+    """
+    expires = str(int(time.time()) + ttl_seconds)
+    signature = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return f"{expires}:{signature}"
+
+def verify_debug_token(token: Optional[str], secret: Optional[str]) -> bool:
+    """署名付きトークンを検証する"""
+    if not token or not secret:
+        return False
+    expires, _, signature = token.partition(":")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def _frame_label(code) -> str:
+    """collapsed形式の1フレーム分の表記（関数名 (ファイル名:行番号)）"""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class _ProfiledRequest:
+    """プロファイル中の1リクエスト分のサンプル"""
+    __slots__ = ("frame", "key", "samples")
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.key = id(frame)
+        self.samples: Counter = Counter()
+
+class StackSampler:
+    """
+    一定間隔で各スレッドのスタックを採取するサンプリングプロファイラー
+
+    プロファイル対象のリクエストがある間だけ採取用のスレッドを動かす。
+    採取したスタックにプロファイル対象のリクエストのフレームが含まれていれば、
+    そのリクエストのサンプルとして数える（同時に処理中の他のリクエストとは混ざらない）。
+
+    スレッドプールのワーカーで実行される処理（def で定義したエンドポイント・依存関係）は
+    スタックにリクエストのフレームを含まないため採取されない。その間は1件も数えないため、
+    同期エンドポイントのルートはイベントループ側の前後処理の分しかサンプルが残らない（ほぼ0件）
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self._active: Dict[int, _ProfiledRequest] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, request: _ProfiledRequest) -> None:
+        with self._lock:
+            self._active[request.key] = request
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+
+    def unregister(self, request: _ProfiledRequest) -> Counter:
+        """
+        採取を終了し、それまでのサンプルの複製を返す
+
+        サンプルへの加算はロックを取得して行うため、返した複製はその後変更されない
+        """
+        with self._lock:
+            self._active.pop(request.key, None)
+            return Counter(request.samples)
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                active = dict(self._active)
+
+            found: List[Tuple[_ProfiledRequest, str]] = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack: List[str] = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    request = active.get(id(frame))
+                    if request is not None and request.frame is frame:
+                        if stack:
+                            found.append((request, ";".join(reversed(stack))))
+                        break
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+
+            with self._lock:
+                for request, stack in found:
+                    # 採取中に終了したリクエストには加算しない
+                    if self._active.get(request.key) is request:
+                        request.samples[stack] += 1
+
+class ProfileStore:
+    """ルートごとのサンプルの集計"""
+
+    def __init__(self, max_stacks: int = MAX_STACKS_PER_ROUTE):
+        self.max_stacks = max_stacks
+        self._stacks: Dict[str, Counter] = {}
+        self._requests: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, route: str, samples: Counter) -> None:
+        with self._lock:
+            self._requests[route] += 1
+            stacks = self._stacks.setdefault(route, Counter())
+            for stack, count in samples.items():
+                if stack not in stacks and len(stacks) >= self.max_stacks:
+                    stack = "[truncated]"
+                stacks[stack] += count
+
+    def routes(self) -> Dict[str, Dict[str, int]]:
+        """ルートごとのプロファイルしたリクエスト数とサンプル数"""
+        with self._lock:
+            return {
+                route: {
+                    "requests": self._requests[route],
+                    "samples": sum(stacks.values()),
+                }
+                for route, stacks in self._stacks.items()
+            }
+
+    def collapsed(self, route: Optional[str] = None) -> str:
+        """
+        collapsed-stack形式（flamegraph.pl / speedscope でそのまま読める）
+
+        routeを指定しない場合は全ルート分を、ルート名を先頭のフレームにして出力する
+        """
+        with self._lock:
+            items = [(route, self._stacks.get(route, Counter()))] if route else list(self._stacks.items())
+            lines = []
+            for name, stacks in items:
+                prefix = "" if route else f"{name};"
+                lines.extend(f"{prefix}{stack} {count}" for stack, count in stacks.most_common())
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def flamegraph(self, route: Optional[str] = None) -> Dict[str, Any]:
+        """
+        フレームグラフのツリー（d3-flame-graph形式の {name, value, children}）
+        """
+        root: Dict[str, Any] = {"name": route or "all", "value": 0, "children": {}}
+        for line in self.collapsed(route).splitlines():
+            stack, _, count = line.rpartition(" ")
+            node = root
+            node["value"] += int(count)
+            for frame in stack.split(";"):
+                node = node["children"].setdefault(frame, {"name": frame, "value": 0, "children": {}})
+                node["value"] += int(count)
+
+        def finalize(node: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                "name": node["name"],
+                "value": node["value"],
+                "children": [finalize(child) for child in node["children"].values()],
+            }
+        return finalize(root)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self._requests.clear()
+
+profile_store = ProfileStore()
+stack_sampler = StackSampler()
+
+def _route_name(scope: Scope) -> str:
+    """
+    ルーティング後のパスのテンプレート（例: GET /wishlist/{item_id}/image）
+
+    ルートが見つからなかったリクエストは、404のスキャンなどで集計の単位が際限なく増えないよう
+    メトリクスと同じ UNMATCHED_ROUTE にまとめる
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None) or UNMATCHED_ROUTE
+    return f"{scope.get('method', '')} {path}"
+
+class ProfilingMiddleware:
+    """
+    一部のリクエストをサンプリングプロファイラーで計測するASGIミドルウェア
+
+    - sample_rateの割合のリクエスト、または署名付きのデバッグヘッダーを持つリクエストを計測する
+    - 計測しないリクエストの追加コストは乱数1回とヘッダーの確認のみ
+    - 結果はルートごとに集計し、管理APIから collapsed / flamegraph 形式で取得する
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        secret: Optional[str] = PROFILING_SECRET,
+        store: ProfileStore = profile_store,
+        sampler: StackSampler = stack_sampler
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.secret = secret
+        self.store = store
+        self.sampler = sampler
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return True
+        if self.secret is None:
+            return False
+        return verify_debug_token(Headers(scope=scope).get(DEBUG_HEADER), self.secret)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        await self._profiled(scope, receive, send)
+
+    async def _profiled(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """このフレームより上のスタックをこのリクエストのサンプルとして数える"""
+        request = _ProfiledRequest(sys._getframe())
+        self.sampler.register(request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            samples = self.sampler.unregister(request)
+            request.frame = None
+            self.store.add(_route_name(scope), samples)
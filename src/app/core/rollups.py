@@ -0,0 +1,345 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from sqlalchemy import Date, delete, event, func, insert, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.db_manager import DatabaseManager, db_manager
+from app.core.partitioning import add_months, month_start
+from app.models.balance import (
+    DailyTransactionRollup,
+    MonthlyTransactionRollup,
+    Transaction,
+    TransactionType
+)
+
+logger = logging.getLogger(__name__)
+
+# 集計の補正（毎時15分）
+ROLLUP_RECONCILE_SCHEDULE = "15 * * * *"
+# 定期的な補正で作り直す日数（今日を含む）
+ROLLUP_RECONCILE_DAYS = 2
+
+# 入金として集計する取引タイプ（それ以外は支出）
+INCOME_TYPES = (
+    TransactionType.DEPOSIT,
+    TransactionType.REWARD,
+    TransactionType.QUEST,
+    TransactionType.JOB,
+)
+
+# 集計のキー: (ユーザーID, 日または月, 取引タイプ, カテゴリー)
+RollupKey = Tuple[int, date, TransactionType, str]
+
+def _aggregate(postings: Iterable[Dict[str, Any]]) -> Tuple[Dict[RollupKey, List], Dict[RollupKey, List]]:
+    """
+    取引を日次・月次のキーごとに [合計額, 件数] にまとめる
+
+    1回のUPSERTで同じ行を2回更新しないよう、書き込む前にキーごとにまとめておく
+    """
+    daily: Dict[RollupKey, List] = defaultdict(lambda: [0.0, 0])
+    monthly: Dict[RollupKey, List] = defaultdict(lambda: [0.0, 0])
+    for posting in postings:
+        day = posting["created_at"].date()
+        transaction_type = TransactionType(posting["transaction_type"])
+        category = posting.get("category") or ""
+        for totals, period in ((daily, day), (monthly, month_start(day))):
+            entry = totals[(posting["user_id"], period, transaction_type, category)]
+            entry[0] += posting["amount"]
+            entry[1] += 1
+    return daily, monthly
+
+def _upsert_increments(connection: Connection, model, period_column: str, totals: Dict[RollupKey, List]) -> None:
+    """
+    集計行に加算する（行がなければ作る）
+
+    PostgreSQL・SQLiteでは ON CONFLICT DO UPDATE で1文で加算し、
+    それ以外では UPDATE して対象の行がなかった場合に INSERT する
+    """
+    if not totals:
+        return
+    table = model.__table__
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            period_column: period,
+            "transaction_type": transaction_type,
+            "category": category,
+            "total_amount": amount,
+            "transaction_count": count,
+            "updated_at": now,
+        }
+        for (user_id, period, transaction_type, category), (amount, count) in totals.items()
+    ]
+    keys = ["user_id", period_column, "transaction_type", "category"]
+
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        statement = dialect_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={
+                "total_amount": table.c.total_amount + statement.excluded.total_amount,
+                "transaction_count": table.c.transaction_count + statement.excluded.transaction_count,
+                "updated_at": statement.excluded.updated_at,
+            }
+        )
+        connection.execute(statement, rows)
+        return
+
+    for row in rows:
+        result = connection.execute(
+            update(table)
+            .where(*(table.c[key] == row[key] for key in keys))
+            .values(
+                total_amount=table.c.total_amount + row["total_amount"],
+                transaction_count=table.c.transaction_count + row["transaction_count"],
+                updated_at=row["updated_at"]
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table), [row])
+
+def apply_postings(connection: Connection, postings: Iterable[Dict[str, Any]]) -> None:
+    """
+    登録した取引を日次・月次の集計に加算する（取引と同じトランザクションで呼ぶ）
+
+    ORMで追加した取引は after_insert のイベントで自動的に加算されるため、
+    insert(Transaction) でまとめて登録した場合にのみ呼び出す
+
+    Args:
+        connection: 取引を登録したコネクション（Session.connection()）
+        postings: user_id / transaction_type / amount / created_at（/ category）を持つ辞書
+    """
+    daily, monthly = _aggregate(postings)
+    _upsert_increments(connection, DailyTransactionRollup, "day", daily)
+    _upsert_increments(connection, MonthlyTransactionRollup, "month", monthly)
+
+@event.listens_for(Transaction, "after_insert")
+def _apply_transaction_insert(mapper, connection: Connection, target: Transaction) -> None:
+    """ORM経由で取引が登録されたら集計に加算する"""
+    apply_postings(connection, [{
+        "user_id": target.user_id,
+        "transaction_type": target.transaction_type,
+        "amount": target.amount,
+        "created_at": target.created_at or datetime.utcnow(),
+        "category": getattr(target, "category", None),
+    }])
+
+def _lock_rollups(connection: Connection) -> None:
+    """
+    補正中に取引の登録による加算が割り込まないよう集計テーブルをロックする（PostgreSQLのみ）
+
+    登録中の取引がコミットされるまで待ってから作り直すため、加算の取りこぼしや二重計上が起きない
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    for model in (DailyTransactionRollup, MonthlyTransactionRollup):
+        connection.execute(text(f"LOCK TABLE {model.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+
+def reconcile_rollups(
+    since: date,
+    until: Optional[date] = None,
+    db: DatabaseManager = db_manager
+) -> Dict[str, int]:
+    """
+    取引テーブルから集計を作り直し、加算の漏れ・ずれを補正する
+
+    1. since〜until の日次の集計を取引テーブルから作り直す
+    2. その期間を含む月の月次の集計を、日次の集計から作り直す
+
+    期間外の集計は変更しないため、パーティションを切り離して取引が残っていない月の
+    集計もそのまま残る。最初に導入する場合は最古の取引の日から実行する（backfill_rollups）
+
+    Args:
+        since (date): 作り直す最初の日
+        until (Optional[date]): 作り直す最後の日（未指定時は今日）
+
+    Returns:
+        Dict[str, int]: 作り直した日次・月次の集計の行数
+    """
+    until = until or datetime.utcnow().date()
+    first_month = month_start(since)
+    next_month = add_months(month_start(until), 1)
+    daily_table = DailyTransactionRollup.__table__
+    monthly_table = MonthlyTransactionRollup.__table__
+    now = datetime.utcnow()
+
+    with db.engine.begin() as connection:
+        _lock_rollups(connection)
+
+        day = func.date(Transaction.created_at, type_=Date)
+        rows = connection.execute(
+            select(
+                Transaction.user_id,
+                day,
+                Transaction.transaction_type,
+                func.sum(Transaction.amount),
+                func.count()
+            )
+            .where(
+                Transaction.created_at >= datetime.combine(since, datetime.min.time()),
+                Transaction.created_at < datetime.combine(until + timedelta(days=1), datetime.min.time())
+            )
+            .group_by(Transaction.user_id, day, Transaction.transaction_type)
+        ).all()
+
+        connection.execute(
+            delete(daily_table).where(daily_table.c.day >= since, daily_table.c.day <= until)
+        )
+        if rows:
+            connection.execute(insert(daily_table), [
+                {
+                    "user_id": user_id,
+                    "day": row_day,
+                    "transaction_type": transaction_type,
+                    "category": "",
+                    "total_amount": total or 0.0,
+                    "transaction_count": count,
+                    "updated_at": now,
+                }
+                for user_id, row_day, transaction_type, total, count in rows
+            ])
+
+        # 月次は日次の集計から作るため、取引テーブルを月全体で読み直さずに済む
+        monthly: Dict[RollupKey, List] = defaultdict(lambda: [0.0, 0])
+        for user_id, row_day, transaction_type, category, total, count in connection.execute(
+            select(
+                daily_table.c.user_id,
+                daily_table.c.day,
+                daily_table.c.transaction_type,
+                daily_table.c.category,
+                daily_table.c.total_amount,
+                daily_table.c.transaction_count
+            ).where(daily_table.c.day >= first_month, daily_table.c.day < next_month)
+        ):
+            entry = monthly[(user_id, month_start(row_day), transaction_type, category)]
+            entry[0] += total
+            entry[1] += count
+
+        connection.execute(
+            delete(monthly_table).where(
+                monthly_table.c.month >= first_month, monthly_table.c.month < next_month
+            )
+        )
+        if monthly:
+            connection.execute(insert(monthly_table), [
+                {
+                    "user_id": user_id,
+                    "month": month,
+                    "transaction_type": transaction_type,
+                    "category": category,
+                    "total_amount": total,
+                    "transaction_count": count,
+                    "updated_at": now,
+                }
+                for (user_id, month, transaction_type, category), (total, count) in monthly.items()
+            ])
+
+    logger.info(
+        f"Reconciled rollups for {since}..{until}: {len(rows)} daily rows, {len(monthly)} monthly rows"
+    )
+    return {"daily": len(rows), "monthly": len(monthly)}
+
+def reconcile_recent_rollups(days: int = ROLLUP_RECONCILE_DAYS, db: DatabaseManager = db_manager) -> Dict[str, int]:
+    """
+    直近days日分の集計を作り直す（定期実行用）
+    """
+    today = datetime.utcnow().date()
+    return reconcile_rollups(today - timedelta(days=days - 1), today, db=db)
+
+def backfill_rollups(db: DatabaseManager = db_manager) -> Dict[str, int]:
+    """
+    全期間の集計を取引テーブルから作る（導入時の初期化用）
+    """
+    with db.engine.connect() as connection:
+        oldest = connection.execute(select(func.min(Transaction.created_at))).scalar()
+    if oldest is None:
+        return {"daily": 0, "monthly": 0}
+    return reconcile_rollups(oldest.date(), db=db)
+
+def register_rollup_reconciliation(scheduler, days: int = ROLLUP_RECONCILE_DAYS) -> None:
+    """
+    集計の定期的な補正をスケジューラーに登録する
+
+    Args:
+        scheduler (RecurringScheduler): 登録先のスケジューラー
+        days (int): 補正で作り直す日数
+    """
+    scheduler.add_schedule(
+        "transaction_rollups:reconcile",
+        ROLLUP_RECONCILE_SCHEDULE,
+        reconcile_recent_rollups,
+        days
+    )
+
+def _period_report(rows: Iterable[Tuple[date, TransactionType, float, int]], period_key: str) -> List[Dict[str, Any]]:
+    """集計行を期間ごとの入金・支出・取引タイプ別の合計にまとめる"""
+    periods: Dict[date, Dict[str, Any]] = {}
+    for period, transaction_type, total, count in rows:
+        report = periods.get(period)
+        if report is None:
+            report = periods[period] = {
+                period_key: period,
+                "income": 0.0,
+                "spending": 0.0,
+                "net": 0.0,
+                "transaction_count": 0,
+                "by_type": {},
+            }
+        if transaction_type in INCOME_TYPES:
+            report["income"] += total
+            report["net"] += total
+        else:
+            report["spending"] += total
+            report["net"] -= total
+        report["transaction_count"] += count
+        by_type = report["by_type"]
+        by_type[transaction_type.value] = by_type.get(transaction_type.value, 0.0) + total
+    return [periods[period] for period in sorted(periods)]
+
+def daily_report(db: Session, user_id: int, since: date, until: date) -> List[Dict[str, Any]]:
+    """
+    日ごとの入金・支出の推移（集計テーブルのみを読む）
+    """
+    rows = db.query(
+        DailyTransactionRollup.day,
+        DailyTransactionRollup.transaction_type,
+        func.sum(DailyTransactionRollup.total_amount),
+        func.sum(DailyTransactionRollup.transaction_count)
+    ).filter(
+        DailyTransactionRollup.user_id == user_id,
+        DailyTransactionRollup.day >= since,
+        DailyTransactionRollup.day <= until
+    ).group_by(
+        DailyTransactionRollup.day,
+        DailyTransactionRollup.transaction_type
+    ).all()
+    return _period_report(rows, "day")
+
+def monthly_report(db: Session, user_id: int, since: date, until: date) -> List[Dict[str, Any]]:
+    """
+    月ごとの入金・支出の推移（集計テーブルのみを読む）
+    """
+    rows = db.query(
+        MonthlyTransactionRollup.month,
+        MonthlyTransactionRollup.transaction_type,
+        func.sum(MonthlyTransactionRollup.total_amount),
+        func.sum(MonthlyTransactionRollup.transaction_count)
+    ).filter(
+        MonthlyTransactionRollup.user_id == user_id,
+        MonthlyTransactionRollup.month >= month_start(since),
+        MonthlyTransactionRollup.month <= until
+    ).group_by(
+        MonthlyTransactionRollup.month,
+        MonthlyTransactionRollup.transaction_type
+    ).all()
+    return _period_report(rows, "month")
@@ -0,0 +1,393 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from bisect import bisect_left
+from zoneinfo import ZoneInfo
+import asyncio
+import calendar
+import heapq
+import itertools
+import logging
+import os
+import random
+
+from app.core.task_manager import ExecutionMode, TaskManager, task_manager
+
+logger = logging.getLogger(__name__)
+
+# スケジュールの既定タイムゾーン
+DEFAULT_TIMEZONE = os.getenv("APP_TIMEZONE", "Asia/Tokyo")
+
+# 複利の支払い（毎週日曜 0:00）
+INTEREST_SCHEDULE = "0 0 * * 0"
+
+class MisfirePolicy:
+    """停止中などで実行予定時刻を過ぎてしまった場合の扱い"""
+    SKIP = "skip"          # 過ぎた分は実行せず、次回の予定から再開する
+    RUN_ONCE = "run_once"  # 過ぎた分をまとめて1回だけ実行する
+    RUN_ALL = "run_all"    # 過ぎた分をすべて実行する（max_catch_up件まで）
+
+class CronSpec:
+    """
+    cron形式（分 時 日 月 曜日）の実行スケジュール
+
+    各フィールドは * / 数値 / 範囲(a-b) / 間隔(*/n, a-b/n) / カンマ区切りに対応する。
+    日フィールドの L は月末、曜日は 0=日曜（7も日曜として扱う）。
+    日と曜日の両方が指定された場合は、cronと同じくどちらかに一致すれば実行する
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression}")
+
+        self.expression = expression
+        minute, hour, day, month, weekday = fields
+        self.minutes = sorted(self._parse_field(minute, 0, 59))
+        self.hours = sorted(self._parse_field(hour, 0, 23))
+        self.last_day = "L" in day.split(",")
+        day = ",".join(part for part in day.split(",") if part != "L") or ("*" if not self.last_day else "")
+        self.days: Set[int] = self._parse_field(day, 1, 31) if day else set()
+        self.months: Set[int] = self._parse_field(month, 1, 12)
+        self.weekdays: Set[int] = {d % 7 for d in self._parse_field(weekday, 0, 7)}
+        self.day_restricted = self.last_day or fields[2] != "*"
+        self.weekday_restricted = fields[4] != "*"
+
+    @staticmethod
+    def _parse_field(value: str, low: int, high: int) -> Set[int]:
+        """cronの1フィールドを値の集合に変換する"""
+        result: Set[int] = set()
+        for part in value.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step < 1:
+                    raise ValueError(f"Invalid step in cron field: {value}")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field out of range ({low}-{high}): {value}")
+            result.update(range(start, end + 1, step))
+        return result
+
+    def matches_day(self, day: date) -> bool:
+        """指定日が実行日に該当するかを判定する"""
+        if day.month not in self.months:
+            return False
+
+        in_days = day.day in self.days or (
+            self.last_day and day.day == calendar.monthrange(day.year, day.month)[1]
+        )
+        # Pythonは月曜=0、cronは日曜=0
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+
+        if self.day_restricted and self.weekday_restricted:
+            return in_days or in_weekdays
+        if self.day_restricted:
+            return in_days
+        if self.weekday_restricted:
+            return in_weekdays
+        return True
+
+    def next_fire(self, after: datetime, tz: ZoneInfo) -> datetime:
+        """
+        指定時刻より後の最初の実行時刻を求める
+
+        計算は現地時刻で行い、夏時間の切り替えで存在しない時刻は切り替え直後に実行する
+
+        Args:
+            after: 基準時刻（タイムゾーン付き）
+            tz: スケジュールのタイムゾーン
+
+        Returns:
+            datetime: 次回実行時刻（UTC）
+        """
+        local = after.astimezone(tz).replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        day = local.date()
+        start_hour, start_minute = local.hour, local.minute
+
+        # 2/29のみ指定のような疎なスケジュールでも確実に見つかるよう約8年分探索する
+        for _ in range(366 * 8):
+            if self.matches_day(day):
+                hit = self._first_time_of_day(start_hour, start_minute)
+                if hit is not None:
+                    hour, minute = hit
+                    candidate = datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz)
+                    return candidate.astimezone(timezone.utc)
+            day += timedelta(days=1)
+            start_hour, start_minute = 0, 0
+
+        raise ValueError(f"Cron expression never fires: {self.expression}")
+
+    def _first_time_of_day(self, hour: int, minute: int) -> Optional[Tuple[int, int]]:
+        """指定時刻以降でその日最初に一致する（時, 分）を返す"""
+        index = bisect_left(self.hours, hour)
+        while index < len(self.hours):
+            candidate_hour = self.hours[index]
+            floor = minute if candidate_hour == hour else 0
+            minute_index = bisect_left(self.minutes, floor)
+            if minute_index < len(self.minutes):
+                return candidate_hour, self.minutes[minute_index]
+            index += 1
+        return None
+
+def cron_for_frequency(
+    frequency: str,
+    hour: int = 0,
+    minute: int = 0,
+    weekday: int = 0,
+    day_of_month: str = "1"
+) -> str:
+    """
+    TaskFrequencyの値からcron形式のスケジュールを作成する
+
+    Args:
+        frequency: daily / weekly / monthly
+        hour: 実行する時
+        minute: 実行する分
+        weekday: 週次の場合の曜日（0=日曜）
+        day_of_month: 月次の場合の日（"1"=月初、"L"=月末）
+    """
+    if frequency == "daily":
+        return f"{minute} {hour} * * *"
+    if frequency == "weekly":
+        return f"{minute} {hour} * * {weekday}"
+    if frequency == "monthly":
+        return f"{minute} {hour} {day_of_month} * *"
+    raise ValueError(f"Unsupported frequency for scheduling: {frequency}")
+
+@dataclass
+class Schedule:
+    """定期実行の登録内容"""
+    schedule_id: str
+    spec: CronSpec
+    func: Callable
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    tz: ZoneInfo = field(default_factory=lambda: ZoneInfo(DEFAULT_TIMEZONE))
+    mode: Optional[ExecutionMode] = None
+    misfire_policy: str = MisfirePolicy.RUN_ONCE
+    misfire_grace_seconds: float = 60.0
+    max_catch_up: int = 10
+    jitter_seconds: float = 0.0
+    next_fire_at: Optional[datetime] = None
+    # next_fire_at に加えたジッター（秒）。遅延はジッター込みの実行予定時刻から測る
+    jitter_offset: float = 0.0
+    last_fired_at: Optional[datetime] = None
+    # ヒープ上で有効なエントリの連番（それ以外のエントリは取り出し時に読み飛ばす）
+    heap_seq: Optional[int] = None
+
+class RecurringScheduler:
+    """
+    TaskManager上で定期ジョブを実行するスケジューラー
+
+    次回実行時刻の最小ヒープを1つのコルーチンが監視し、先頭の時刻まで眠る。
+    登録数に関係なく待機中はCPUをほとんど使わない
+    """
+
+    def __init__(self, task_manager: TaskManager):
+        """
+        Args:
+            task_manager (TaskManager): ジョブを実行するタスクマネージャー
+        """
+        self.task_manager = task_manager
+        self.schedules: Dict[str, Schedule] = {}
+        # （実行予定時刻, 連番, スケジュールID）。登録解除・変更されたエントリは取り出し時に読み飛ばす
+        self._heap: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        # 実行中の登録処理（完了前にガベージコレクションされないよう参照を保持する）
+        self._submissions: Set[asyncio.Task] = set()
+
+    def add_schedule(
+        self,
+        schedule_id: str,
+        cron: str,
+        func: Callable,
+        *args,
+        tz: Optional[str] = None,
+        mode: Optional[ExecutionMode] = None,
+        misfire_policy: str = MisfirePolicy.RUN_ONCE,
+        misfire_grace_seconds: float = 60.0,
+        jitter_seconds: float = 0.0,
+        last_fired_at: Optional[datetime] = None,
+        **kwargs
+    ) -> Schedule:
+        """
+        定期実行を登録する
+
+        Args:
+            schedule_id (str): スケジュールの一意識別子。タスク名にも使うため、ユーザーごとなどの
+                詳細は「種類:詳細」の形で付ける（メトリクスは種類ごとに集計される）
+            cron (str): cron形式のスケジュール
+            func: 実行する関数
+            *args: 関数の位置引数
+            tz (Optional[str]): タイムゾーン名（未指定時はDEFAULT_TIMEZONE）
+            mode (Optional[ExecutionMode]): 実行バックエンド（未指定時は関数の種類から判定）
+            misfire_policy (str): 実行予定を過ぎた場合の扱い（MisfirePolicy）
+            misfire_grace_seconds (float): 遅れても予定通りとみなす猶予（秒）
+            jitter_seconds (float): 実行時刻をずらす最大秒数（同時刻への集中を避ける）
+            last_fired_at (Optional[datetime]): 前回の実行時刻。再起動時に渡すと停止中の分を判定できる
+            **kwargs: 関数のキーワード引数
+
+        Returns:
+            Schedule: 登録されたスケジュール
+        """
+        if schedule_id in self.schedules:
+            raise ValueError(f"Schedule with ID {schedule_id} already exists")
+
+        schedule = Schedule(
+            schedule_id=schedule_id,
+            spec=CronSpec(cron),
+            func=func,
+            args=args,
+            kwargs=kwargs,
+            tz=ZoneInfo(tz or DEFAULT_TIMEZONE),
+            mode=mode,
+            misfire_policy=misfire_policy,
+            misfire_grace_seconds=misfire_grace_seconds,
+            jitter_seconds=jitter_seconds,
+            last_fired_at=last_fired_at
+        )
+        base = last_fired_at or datetime.now(timezone.utc)
+        schedule.next_fire_at = schedule.spec.next_fire(base, schedule.tz)
+        self.schedules[schedule_id] = schedule
+        self._push(schedule)
+        return schedule
+
+    def remove_schedule(self, schedule_id: str) -> None:
+        """
+        定期実行の登録を解除する
+        """
+        schedule = self.schedules.pop(schedule_id, None)
+        if schedule is None:
+            raise ValueError(f"Schedule with ID {schedule_id} not found")
+        # ヒープに残ったエントリは取り出し時に読み飛ばされる
+        schedule.heap_seq = None
+
+    def _push(self, schedule: Schedule) -> None:
+        """次回実行時刻（ジッター込み）をヒープに登録する"""
+        schedule.jitter_offset = 0.0
+        if schedule.jitter_seconds > 0:
+            schedule.jitter_offset = random.uniform(0, schedule.jitter_seconds)
+        fire_ts = schedule.next_fire_at.timestamp() + schedule.jitter_offset
+        schedule.heap_seq = next(self._counter)
+        heapq.heappush(self._heap, (fire_ts, schedule.heap_seq, schedule.schedule_id))
+        # 先頭より早い予定が入った場合は待機中のループを起こす
+        if self._heap[0][2] == schedule.schedule_id:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """
+        スケジューラーを開始する
+        """
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """
+        スケジューラーを停止する（実行中のタスクはTaskManager側で継続する）
+        """
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    async def _run(self) -> None:
+        """先頭の実行予定時刻まで待機し、到来したスケジュールを実行する"""
+        loop = asyncio.get_event_loop()
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            fire_ts, seq, schedule_id = self._heap[0]
+            delay = fire_ts - datetime.now(timezone.utc).timestamp()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            schedule = self.schedules.get(schedule_id)
+            # 登録解除されたスケジュールや、同じIDで登録し直す前のエントリは読み飛ばす
+            if schedule is None or schedule.heap_seq != seq:
+                continue
+            try:
+                self._fire_due(schedule, loop)
+            except Exception as e:
+                logger.error(f"Schedule {schedule_id} failed to fire: {e}")
+            self._push(schedule)
+
+    def _fire_due(self, schedule: Schedule, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        到来した実行予定を処理し、次回実行時刻を進める
+
+        ジッター込みの実行予定時刻から猶予を超えて遅れた予定は、
+        停止中に取りこぼしたものとして misfire_policy に従う
+        """
+        now = datetime.now(timezone.utc)
+        due: List[datetime] = []
+        nominal = schedule.next_fire_at
+        while nominal <= now:
+            due.append(nominal)
+            nominal = schedule.spec.next_fire(nominal, schedule.tz)
+            if len(due) > schedule.max_catch_up:
+                break
+        # 取りこぼしが多すぎる場合でも、次回は現在時刻以降から再開する
+        if nominal <= now:
+            nominal = schedule.spec.next_fire(now, schedule.tz)
+        schedule.next_fire_at = nominal
+
+        grace = schedule.misfire_grace_seconds + schedule.jitter_offset
+        on_time = [t for t in due if (now - t).total_seconds() <= grace]
+        missed = [t for t in due if t not in on_time]
+        if missed:
+            logger.warning(
+                f"Schedule {schedule.schedule_id} missed {len(missed)} run(s); "
+                f"policy={schedule.misfire_policy}"
+            )
+            if schedule.misfire_policy == MisfirePolicy.RUN_ALL:
+                on_time = missed[:schedule.max_catch_up] + on_time
+            elif schedule.misfire_policy == MisfirePolicy.RUN_ONCE and not on_time:
+                on_time = [missed[-1]]
+
+        for fire_at in on_time:
+            schedule.last_fired_at = fire_at
+            task = loop.create_task(self._submit(schedule, fire_at))
+            self._submissions.add(task)
+            task.add_done_callback(self._submissions.discard)
+
+    async def _submit(self, schedule: Schedule, fire_at: datetime) -> None:
+        """実行予定1回分をTaskManagerのタスクとして登録・実行する"""
+        task_id = f"{schedule.schedule_id}@{fire_at.isoformat()}"
+        try:
+            await self.task_manager.add_task(
+                task_id,
+                schedule.schedule_id,
+                schedule.func,
+                *schedule.args,
+                mode=schedule.mode,
+                **schedule.kwargs
+            )
+            await self.task_manager.execute_task(task_id)
+        except ValueError as e:
+            # 同じ予定時刻のタスクが既に登録されている場合は二重実行しない
+            logger.warning(f"Skipped scheduled run {task_id}: {e}")
+
+# アプリケーション共通のスケジューラー（起動・停止は app.main で行う）
+scheduler = RecurringScheduler(task_manager)
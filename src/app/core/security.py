@@ -1,9 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import time
 import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, Security
 from fastapi.security import OAuth2PasswordBearer
+from app.core.cache import ExpiringSet, TTLCache
 from app.core.config import settings
 
 class SecurityManager:
@@ -15,8 +22,20 @@ class SecurityManager:
     """
     
     def __init__(self):
+        # bcryptのコスト（これより低いコストのハッシュはログイン成功時に作り直す）
+        self.BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
         # パスワードハッシュ化の設定
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.pwd_context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__rounds=self.BCRYPT_ROUNDS,
+            bcrypt__min_rounds=self.BCRYPT_ROUNDS
+        )
+        # ハッシュ計算専用のスレッド数と、待ちを含めて受け付ける最大件数
+        self.HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+        self.HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+        self._hash_executor: Optional[ThreadPoolExecutor] = None
+        self._hash_pending = 0
         # OAuth2認証スキームの設定
         self.oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
         # JWTシークレットキー
@@ -25,6 +44,15 @@ class SecurityManager:
         self.ALGORITHM = "HS256"
         # アクセストークンの有効期限（分）
         self.ACCESS_TOKEN_EXPIRE_MINUTES = 30
+        # 検証済みトークンのクレーム（トークンのダイジェストがキー。トークンのexpまで保持）
+        self.token_cache = TTLCache(
+            maxsize=10000,
+            ttl=self.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            name="jwt_claims"
+        )
+        # 失効させたトークンのダイジェスト（トークンのexpまで保持し、件数では破棄しない。
+        # expのないトークンは期限がないため、失効も無期限に保持する）
+        self.revoked_tokens = ExpiringSet(name="jwt_revoked")
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """
@@ -38,6 +66,69 @@ class SecurityManager:
         """
         return self.pwd_context.hash(password)
 
+    def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        パスワードを検証し、ハッシュのコストが古い場合は新しいハッシュも返す
+
+        Returns:
+            Tuple[bool, Optional[str]]: (検証結果, 作り直したハッシュ。不要な場合はNone)
+        """
+        return self.pwd_context.verify_and_update(plain_password, hashed_password)
+
+    async def _run_hash(self, func: Callable, *args) -> Any:
+        """
+        ハッシュ計算を専用のスレッドプールで実行する（イベントループを止めない）
+
+        待ちを含めた件数が上限に達している場合は、待たせずに503を返す
+        """
+        if self._hash_pending >= self.HASH_MAX_PENDING:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many authentication requests. Please retry later",
+                headers={"Retry-After": "1"},
+            )
+        if self._hash_executor is None:
+            self._hash_executor = ThreadPoolExecutor(
+                max_workers=self.HASH_WORKERS,
+                thread_name_prefix="password-hash"
+            )
+
+        self._hash_pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._hash_executor, partial(func, *args))
+        finally:
+            self._hash_pending -= 1
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        パスワードの検証を行う（非同期版）
+        """
+        return await self._run_hash(self.verify_password, plain_password, hashed_password)
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """
+        パスワードをハッシュ化する（非同期版）
+        """
+        return await self._run_hash(self.get_password_hash, password)
+
+    async def verify_and_update_async(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        パスワードを検証し、必要に応じて作り直したハッシュを返す（非同期版）
+        """
+        return await self._run_hash(self.verify_and_update, plain_password, hashed_password)
+
+    def hash_stats(self) -> Dict[str, Any]:
+        """
+        ハッシュ計算の実行状況を返す
+        """
+        return {
+            "workers": self.HASH_WORKERS,
+            "pending": self._hash_pending,
+            "max_pending": self.HASH_MAX_PENDING,
+            "saturation": self._hash_pending / self.HASH_WORKERS,
+        }
+
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """
         JWTアクセストークンを生成する
@@ -52,12 +143,42 @@ class SecurityManager:
         encoded_jwt = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
         return encoded_jwt
 
+    @staticmethod
+    def _token_digest(token: str) -> str:
+        """キャッシュのキーにするトークンのダイジェスト（トークンそのものは保持しない）"""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def _seconds_until_expiry(payload: Dict[str, Any]) -> Optional[float]:
+        """クレームのexpまでの秒数（expがない場合はNone）"""
+        exp = payload.get("exp")
+        if exp is None:
+            return None
+        return float(exp) - time.time()
+
     def decode_token(self, token: str) -> dict:
         """
         トークンをデコードして検証する
+
+        検証済みのトークンはexpまでクレームをキャッシュし、
+        同じトークンでの2回目以降のリクエストでは署名の検証を省略する
         """
+        digest = self._token_digest(token)
+        if digest in self.revoked_tokens:
+            raise HTTPException(
+                status_code=401,
+                detail="Token has been revoked"
+            )
+
+        cached = self.token_cache.get(digest)
+        if cached is not None:
+            return dict(cached)
+
         try:
             payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            ttl = self._seconds_until_expiry(payload)
+            if ttl is None or ttl > 0:
+                self.token_cache.set(digest, dict(payload), ttl=ttl)
             return payload
         except jwt.ExpiredSignatureError:
             raise HTTPException(
@@ -88,6 +209,37 @@ class SecurityManager:
         except jwt.JWTError:
             raise credentials_exception
 
+    def revoke_token(self, token: str) -> None:
+        """
+        トークンを失効させる（ログアウト・パスワード変更時など）
+
+        キャッシュから削除し、有効期限まではキャッシュを経由せずに拒否する
+        """
+        digest = self._token_digest(token)
+        self.token_cache.invalidate(digest)
+        try:
+            payload = jwt.decode(
+                token,
+                self.SECRET_KEY,
+                algorithms=[self.ALGORITHM],
+                options={"verify_exp": False}
+            )
+        except jwt.JWTError:
+            # 署名が不正なトークンはそもそも受け付けないため記録不要
+            return
+        ttl = self._seconds_until_expiry(payload)
+        if ttl is None or ttl > 0:
+            self.revoked_tokens.add(digest, ttl=ttl)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        トークン検証キャッシュのヒット率などを返す
+        """
+        return {
+            "token_cache": self.token_cache.stats(),
+            "revoked": len(self.revoked_tokens),
+        }
+
     def verify_permission(self, user: dict, required_role: str) -> bool:
         """
         ユーザーの権限を確認する
@@ -95,4 +247,11 @@ class SecurityManager:
         return user.get("role") == required_role
 
 # セキュリティマネージャーのインスタンスを作成
-security_manager = SecurityManager()
\ No newline at end of file
+security_manager = SecurityManager()
+
+# モデルなどから直接使うためのエイリアス
+get_password_hash = security_manager.get_password_hash
+verify_password = security_manager.verify_password
+get_password_hash_async = security_manager.get_password_hash_async
+verify_password_async = security_manager.verify_password_async
+verify_and_update_async = security_manager.verify_and_update_async
\ No newline at end of file
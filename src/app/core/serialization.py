@@ -0,0 +1,94 @@
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import json
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjsonがない環境では標準のjsonで出力する
+    orjson = None
+
+def _default(value: Any) -> Any:
+    """標準のJSONで扱えない値の変換"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """
+    JSONにエンコードする（orjsonがあればorjsonを使う）
+
+    datetimeはisoformat()と同じ形式、Enumは値で出力する
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+class FastJSONResponse(Response):
+    """
+    検証済みのデータをそのままエンコードするJSONレスポンス
+
+    response_modelによる再検証を経由しないため、DBから取得した行など
+    形が保証されているデータにのみ使う
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def parse_fields(
+    fields: Optional[str],
+    available: Sequence[str],
+    default: Optional[Sequence[str]] = None
+) -> List[str]:
+    """
+    カンマ区切りの fields= パラメータを検証し、返す項目名のリストにする
+
+    Args:
+        fields (Optional[str]): リクエストで指定された項目（未指定時はdefault）
+        available: 指定できる項目名
+        default: 未指定時に返す項目（未指定時はavailableすべて）
+
+    Raises:
+        ValueError: 指定できない項目が含まれている場合
+    """
+    requested = [name.strip() for name in (fields or "").split(",") if name.strip()]
+    if not requested:
+        return list(default or available)
+    unknown = [name for name in requested if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # 重複を除き、指定された順を保つ
+    return list(dict.fromkeys(requested))
+
+def rows_to_dicts(keys: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    列のタプルをキー付きの辞書にする（ORMインスタンスを作らない）
+
+    Args:
+        keys: 列名
+        rows: クエリ結果の行
+    """
+    return [dict(zip(keys, row)) for row in rows]
+
+def query_response(query) -> FastJSONResponse:
+    """
+    列を指定したクエリの結果をそのままJSONレスポンスにする
+
+    Args:
+        query: db.query(Model.col1, Model.col2, ...) の形のクエリ
+    """
+    keys = [column["name"] for column in query.column_descriptions]
+    return FastJSONResponse(rows_to_dicts(keys, query.all()))
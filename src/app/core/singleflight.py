@@ -0,0 +1,199 @@
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional
+import asyncio
+import inspect
+import threading
+
+from app.core.cache import TTLCache
+
+_MISSING = object()
+
+class _Call:
+    """同期関数の実行中の呼び出し（後から来た呼び出しは完了を待つ）"""
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """
+    同じキーの同時実行をまとめる
+
+    - 同じキーの処理が実行中であれば、新しく実行せずにその結果を待って共有する
+    - 例外も待っていたすべての呼び出しに伝える（例外は猶予期間の対象にしない）
+    - 完了後grace秒の間は結果を使い回す（同時に開いた複数の端末からの少しずれた呼び出し向け）
+
+    結果は呼び出し元の間で同じオブジェクトを共有するため、受け取った側で変更しないこと
+    """
+
+    def __init__(self, name: str, grace: float = 1.0, maxsize: int = 1024):
+        """
+        Args:
+            name (str): 統計出力用の名前
+            grace (float): 完了後に結果を使い回す期間（秒）。0の場合は使い回さない
+            maxsize (int): 使い回す結果の最大件数
+        """
+        self.name = name
+        self.grace = grace
+        self.results = TTLCache(maxsize=maxsize, ttl=grace, name=f"singleflight:{name}")
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def _store(self, key: Hashable, result: Any) -> None:
+        if self.grace > 0:
+            self.results.set(key, result)
+
+    async def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """
+        非同期関数をキーごとに1つだけ実行し、結果を共有する
+
+        処理は別タスクで実行するため、最初の呼び出し元がキャンセルされても
+        待っている他の呼び出しには結果が届く
+        """
+        cached = self.results.get(key, _MISSING)
+        if cached is not _MISSING:
+            self.shared += 1
+            return cached
+
+        task = self._tasks.get(key)
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._tasks[key] = task
+
+            def _finish(done: asyncio.Task) -> None:
+                if self._tasks.get(key) is done:
+                    del self._tasks[key]
+                # 待っている呼び出しがすべてキャンセルされても警告を出さないよう例外を取り出しておく
+                if not done.cancelled() and done.exception() is None:
+                    self._store(key, done.result())
+
+            task.add_done_callback(_finish)
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+    def do_sync(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """
+        同期関数をキーごとに1つだけ実行し、結果を共有する（スレッド間でまとめる）
+        """
+        cached = self.results.get(key, _MISSING)
+        if cached is not _MISSING:
+            self.shared += 1
+            return cached
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            self._store(key, call.result)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def forget(self, key: Hashable) -> None:
+        """
+        使い回している結果を破棄する（元のデータが更新された場合など）
+        """
+        self.results.invalidate(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        実行回数と、実行せずに結果を共有した回数
+        """
+        return {
+            "name": self.name,
+            "executed": self.executed,
+            "shared": self.shared,
+            "in_flight": len(self._tasks) + len(self._calls),
+        }
+
+def _argument_key(name: str, value: Any) -> Hashable:
+    """既定のキーに使う引数の表現"""
+    if name == "self":
+        # メソッドの場合はインスタンスの設定値が同じであれば同じ結果になるとみなす
+        return (type(value).__qualname__, repr(getattr(value, "__dict__", None)))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+def single_flight(
+    key: Optional[Callable[..., Hashable]] = None,
+    grace: float = 1.0,
+    name: Optional[str] = None
+) -> Callable:
+    """
+    同じ引数の同時呼び出しをまとめるデコレーター（同期関数・非同期関数の両方に使える）
+
+    Args:
+        key: 引数（キーワード引数として渡す）からキーを作る関数。
+            未指定時はすべての引数をキーにする。ルーターの関数ではDBセッションなど
+            リクエストごとに異なる引数を含めないよう、必ずユーザーとパラメータから作ること
+        grace (float): 完了後に結果を使い回す期間（秒）
+        name (Optional[str]): 統計出力用の名前（未指定時は関数名）
+
+    ルーターの関数でブロッキングするDB処理をまとめる場合は同期関数にすること
+    （awaitしない非同期関数はイベントループ上で1つずつ実行され、同時実行にならない）
+
+    例:
+        @router.get("/forecast")
+        @single_flight(key=lambda current_user, days, **_: (current_user.id, days), grace=0)
+        def get_balance_forecast(current_user=Depends(...), db=Depends(...), days: int = 30):
+            ...
+
+    デコレートした関数の group 属性から SingleFlight（stats / forget）を参照できる
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        group = SingleFlight(name or func.__qualname__, grace=grace)
+
+        def make_key(args, kwargs) -> Hashable:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if key is not None:
+                return key(**bound.arguments)
+            return tuple(
+                (arg_name, _argument_key(arg_name, value))
+                for arg_name, value in bound.arguments.items()
+            )
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await group.do(make_key(args, kwargs), func, *args, **kwargs)
+            async_wrapper.group = group
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return group.do_sync(make_key(args, kwargs), func, *args, **kwargs)
+        wrapper.group = group
+        return wrapper
+
+    return decorator
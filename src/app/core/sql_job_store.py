@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+import json
+import logging
+import uuid
+
+from sqlalchemy import Column, DateTime, Integer, String, Text, and_, or_
+
+from app.core.db_manager import Base, DatabaseManager
+from app.core.job_store import Job, JobStatus, JobStore
+
+logger = logging.getLogger(__name__)
+
+class JobRecord(Base):
+    """永続ジョブのテーブル定義"""
+    __tablename__ = "task_jobs"
+
+    id = Column(String(36), primary_key=True)
+    name = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default=JobStatus.PENDING, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    locked_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SQLJobStore(JobStore):
+    """
+    DatabaseManager経由でジョブを永続化するジョブストア
+
+    PostgreSQLでは SELECT ... FOR UPDATE SKIP LOCKED で行ロックを取り合わずに取得するため、
+    ワーカー数に比例してスループットが伸びる。
+    SQLiteなど SKIP LOCKED 非対応のDBでは、条件付きUPDATEによる楽観的な取得にフォールバックする
+    """
+
+    def __init__(self, db: DatabaseManager, **kwargs):
+        """
+        Args:
+            db (DatabaseManager): データベースマネージャー
+        """
+        super().__init__(**kwargs)
+        self.db = db
+        self.supports_skip_locked = db.engine.dialect.name == "postgresql"
+
+    @staticmethod
+    def _to_job(record: JobRecord) -> Job:
+        payload = json.loads(record.payload)
+        return Job(
+            job_id=record.id,
+            name=record.name,
+            args=payload.get("args", []),
+            kwargs=payload.get("kwargs", {}),
+            attempts=record.attempts,
+            max_attempts=record.max_attempts,
+            status=record.status,
+            result=json.loads(record.result) if record.result else None,
+            error=record.last_error
+        )
+
+    @staticmethod
+    def _claimable(now: datetime):
+        """取得可能なジョブの条件（未実行、またはリース切れの実行中ジョブ）"""
+        return and_(
+            JobRecord.run_after <= now,
+            JobRecord.attempts < JobRecord.max_attempts,
+            or_(
+                JobRecord.status == JobStatus.PENDING,
+                and_(
+                    JobRecord.status == JobStatus.RUNNING,
+                    JobRecord.lease_expires_at <= now
+                )
+            )
+        )
+
+    def enqueue(self, name, args=None, kwargs=None, max_attempts=3, run_after=None, job_id=None) -> str:
+        job_id = job_id or str(uuid.uuid4())
+        with self.db.get_db() as session:
+            session.add(JobRecord(
+                id=job_id,
+                name=name,
+                payload=json.dumps({"args": list(args or []), "kwargs": dict(kwargs or {})}),
+                max_attempts=max_attempts,
+                run_after=run_after or datetime.utcnow()
+            ))
+        return job_id
+
+    def claim(self, worker_id, limit, lease_seconds) -> List[Job]:
+        now = datetime.utcnow()
+        lease_expires_at = now + timedelta(seconds=lease_seconds)
+        with self.db.get_db() as session:
+            # 再試行回数を使い切ったままリースが切れたジョブは失敗扱いにする
+            session.query(JobRecord).filter(
+                JobRecord.status == JobStatus.RUNNING,
+                JobRecord.lease_expires_at <= now,
+                JobRecord.attempts >= JobRecord.max_attempts
+            ).update(
+                {"status": JobStatus.FAILED, "locked_by": None},
+                synchronize_session=False
+            )
+
+            query = session.query(JobRecord)\
+                .filter(self._claimable(now))\
+                .order_by(JobRecord.run_after)\
+                .limit(limit)
+
+            if self.supports_skip_locked:
+                records = query.with_for_update(skip_locked=True).all()
+            else:
+                records = []
+                for candidate_id, in query.with_entities(JobRecord.id).all():
+                    # 他のワーカーが先に取得していれば更新件数が0になる
+                    updated = session.query(JobRecord).filter(
+                        JobRecord.id == candidate_id,
+                        self._claimable(now)
+                    ).update(
+                        {"status": JobStatus.RUNNING, "locked_by": worker_id},
+                        synchronize_session=False
+                    )
+                    if updated:
+                        records.append(session.query(JobRecord).get(candidate_id))
+
+            for record in records:
+                record.status = JobStatus.RUNNING
+                record.locked_by = worker_id
+                record.lease_expires_at = lease_expires_at
+                record.attempts += 1
+            session.flush()
+            return [self._to_job(record) for record in records]
+
+    def extend_lease(self, job_id, worker_id, lease_seconds) -> bool:
+        with self.db.get_db() as session:
+            updated = session.query(JobRecord).filter(
+                JobRecord.id == job_id,
+                JobRecord.locked_by == worker_id,
+                JobRecord.status == JobStatus.RUNNING
+            ).update(
+                {"lease_expires_at": datetime.utcnow() + timedelta(seconds=lease_seconds)},
+                synchronize_session=False
+            )
+            return bool(updated)
+
+    def complete(self, job_id, worker_id, result=None) -> None:
+        with self.db.get_db() as session:
+            session.query(JobRecord).filter(
+                JobRecord.id == job_id,
+                JobRecord.locked_by == worker_id
+            ).update(
+                {
+                    "status": JobStatus.COMPLETED,
+                    "locked_by": None,
+                    "lease_expires_at": None,
+                    "result": json.dumps(result, default=str)
+                },
+                synchronize_session=False
+            )
+
+    def fail(self, job_id, worker_id, error) -> None:
+        with self.db.get_db() as session:
+            record = session.query(JobRecord).filter(
+                JobRecord.id == job_id,
+                JobRecord.locked_by == worker_id
+            ).first()
+            if not record:
+                return
+            record.last_error = error
+            record.locked_by = None
+            record.lease_expires_at = None
+            if record.attempts < record.max_attempts:
+                record.status = JobStatus.PENDING
+                record.run_after = datetime.utcnow() + self.backoff(record.attempts)
+            else:
+                record.status = JobStatus.FAILED
+
+    def get(self, job_id) -> Optional[Job]:
+        with self.db.get_db() as session:
+            record = session.query(JobRecord).get(job_id)
+            return self._to_job(record) if record else None
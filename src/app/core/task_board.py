@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+
+from sqlalchemy import literal
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.cache import TTLCache
+from app.core.serialization import rows_to_dicts
+from app.models.task import Quest, RegularTask, TaskCompletion, TaskFrequency
+
+# ユーザーごとに組み立て済みのタスクボード（ETag, ボード）を保持する
+task_board_cache = TTLCache(maxsize=1024, ttl=60, name="task_board")
+
+def period_start(frequency: TaskFrequency, now: datetime) -> datetime:
+    """
+    タスクの頻度に応じた「今期」の開始時刻を返す
+
+    日次は当日、週次は今週の月曜、月次（および単発）は今月1日の0時
+    """
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if frequency == TaskFrequency.DAILY:
+        return today
+    if frequency == TaskFrequency.WEEKLY:
+        return today - timedelta(days=today.weekday())
+    return today.replace(day=1)
+
+def load_task_board(db: Session, user_id: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    お仕事ボードとクエストボードをまとめて読み込む
+
+    タスク数に関係なく、定期タスク・今期の完了記録・クエストの3クエリで取得する
+
+    Args:
+        db (Session): データベースセッション
+        user_id (int): ユーザーID
+        now (Optional[datetime]): 基準時刻（未指定時は現在時刻）
+
+    Returns:
+        Dict[str, Any]: regular_tasks / quests を含むボード
+    """
+    now = now or datetime.utcnow()
+    since = min(period_start(frequency, now) for frequency in TaskFrequency)
+
+    regular_tasks = db.query(RegularTask)\
+        .options(selectinload(
+            RegularTask.completions.and_(TaskCompletion.completed_at >= since)
+        ))\
+        .filter(RegularTask.user_id == user_id, RegularTask.is_active.is_(True))\
+        .order_by(RegularTask.id)\
+        .all()
+
+    quests = db.query(Quest)\
+        .filter(Quest.user_id == user_id)\
+        .order_by(Quest.id)\
+        .all()
+
+    board_tasks = []
+    for task in regular_tasks:
+        start = period_start(task.frequency, now)
+        completions = [c for c in task.completions if c.completed_at >= start]
+        item = task.to_dict()
+        item["completions"] = [
+            {
+                "id": c.id,
+                "completed_at": c.completed_at.isoformat(),
+                "verified": c.verified,
+            }
+            for c in completions
+        ]
+        item["period_start"] = start.isoformat()
+        board_tasks.append(item)
+
+    return {
+        "regular_tasks": board_tasks,
+        "quests": [quest.to_dict() for quest in quests],
+    }
+
+def list_user_tasks(db: Session, user_id: int) -> List[Dict[str, Any]]:
+    """
+    ユーザーの定期タスクとクエストを列のみのクエリで取得する（ORMインスタンスを作らない）
+
+    task_type が "regular" の項目は頻度・有効フラグを、"quest" の項目は難易度・期間・状態を持つ。
+    定期タスク、クエストの順に、それぞれID順で返す
+
+    Args:
+        db (Session): データベースセッション
+        user_id (int): ユーザーID
+    """
+    tasks = []
+    for query in (
+        db.query(
+            RegularTask.id,
+            literal("regular").label("task_type"),
+            RegularTask.title,
+            RegularTask.description,
+            RegularTask.reward_amount,
+            RegularTask.frequency,
+            RegularTask.is_active,
+            RegularTask.created_at,
+            RegularTask.updated_at
+        ).filter(RegularTask.user_id == user_id).order_by(RegularTask.id),
+        db.query(
+            Quest.id,
+            literal("quest").label("task_type"),
+            Quest.title,
+            Quest.description,
+            Quest.reward_amount,
+            Quest.difficulty,
+            Quest.duration_days,
+            Quest.status,
+            Quest.start_date,
+            Quest.end_date,
+            Quest.created_at,
+            Quest.updated_at
+        ).filter(Quest.user_id == user_id).order_by(Quest.id),
+    ):
+        keys = [column["name"] for column in query.column_descriptions]
+        tasks.extend(rows_to_dicts(keys, query.all()))
+    return tasks
+
+def get_task_board(db: Session, user_id: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    キャッシュを利用してタスクボードを取得する
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: (ETag, ボード)
+    """
+    cached = task_board_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    board = load_task_board(db, user_id)
+    digest = hashlib.sha1(
+        json.dumps(board, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    cached = (f'"{digest}"', board)
+    task_board_cache.set(user_id, cached)
+    return cached
+
+def invalidate_task_board(user_id: int) -> None:
+    """
+    タスクの作成・完了時にユーザーのボードのキャッシュを破棄する
+    """
+    task_board_cache.invalidate(user_id)
@@ -0,0 +1,253 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import and_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.balance import Balance, Transaction, TransactionKey, TransactionType
+from app.models.task import Quest, RegularTask, TaskCompletion, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class QuestCompletionResult:
+    """クエスト完了処理の結果"""
+    quest_id: int
+    transaction_id: int
+    reward_amount: float
+    current_balance: float
+    replayed: bool = False
+
+class IdempotencyKeyReusedError(Exception):
+    """冪等キーが別のクエストの完了に使われていた場合"""
+
+def _replay(db: Session, quest_id: int, user_id: int, idempotency_key: str) -> Optional[QuestCompletionResult]:
+    """
+    同じ冪等キーで処理済みであれば、その結果を返す
+
+    Raises:
+        IdempotencyKeyReusedError: キーが別のクエストの完了に使われていた場合
+    """
+    # created_atも結合条件にし、取引テーブルがパーティション化されていても1つのパーティションだけを見る
+    previous = db.query(Transaction.id, Transaction.amount, TransactionKey.quest_id)\
+        .join(TransactionKey, and_(
+            TransactionKey.transaction_id == Transaction.id,
+            TransactionKey.transaction_created_at == Transaction.created_at
+        ))\
+        .filter(
+            TransactionKey.idempotency_key == idempotency_key,
+            TransactionKey.user_id == user_id
+        ).first()
+    if not previous:
+        return None
+    # quest_idがないのはパーティション化の際に移行したキー（対象を照合できないため、そのまま返す）
+    if previous.quest_id is not None and previous.quest_id != quest_id:
+        raise IdempotencyKeyReusedError(
+            f"Idempotency key was already used for quest {previous.quest_id}"
+        )
+
+    current_balance = db.query(Balance.current_amount)\
+        .filter(Balance.user_id == user_id)\
+        .scalar()
+    return QuestCompletionResult(
+        quest_id=quest_id,
+        transaction_id=previous.id,
+        reward_amount=previous.amount,
+        current_balance=current_balance or 0.0,
+        replayed=True
+    )
+
+def complete_quest_with_reward(
+    db: Session,
+    quest_id: int,
+    user_id: int,
+    idempotency_key: str
+) -> Optional[QuestCompletionResult]:
+    """
+    クエストを完了にし、報酬を即時に付与する
+
+    クエストの状態更新・報酬取引の登録・残高の加算を1つのトランザクションで行う。
+    状態更新は「未完了の場合のみ」の条件付きUPDATEのため、連打されても報酬は1回しか付与されない。
+    同じ冪等キーでの再送には、最初の処理結果をそのまま返す
+
+    Args:
+        db (Session): データベースセッション
+        quest_id (int): クエストID
+        user_id (int): ユーザーID
+        idempotency_key (str): クライアントが指定する冪等キー
+
+    Returns:
+        Optional[QuestCompletionResult]: 処理結果（クエストが存在しない場合はNone）
+
+    Raises:
+        ValueError: 別のリクエストで既に完了済みの場合
+        IdempotencyKeyReusedError: 冪等キーが別のクエストの完了に使われていた場合
+    """
+    replayed = _replay(db, quest_id, user_id, idempotency_key)
+    if replayed:
+        return replayed
+
+    reward_amount = db.query(Quest.reward_amount)\
+        .filter(Quest.id == quest_id, Quest.user_id == user_id)\
+        .scalar()
+    if reward_amount is None:
+        return None
+
+    now = datetime.utcnow()
+    try:
+        completed = db.execute(
+            update(Quest)
+            .where(
+                Quest.id == quest_id,
+                Quest.user_id == user_id,
+                Quest.status != TaskStatus.COMPLETED
+            )
+            .values(status=TaskStatus.COMPLETED, end_date=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not completed:
+            db.rollback()
+            # 同じキーのリクエストが並行して先に処理を終えていた場合
+            replayed = _replay(db, quest_id, user_id, idempotency_key)
+            if replayed:
+                return replayed
+            raise ValueError("Quest is already completed")
+
+        balance = db.query(Balance)\
+            .filter(Balance.user_id == user_id)\
+            .with_for_update()\
+            .first()
+        if not balance:
+            balance = Balance(user_id=user_id, current_amount=0.0)
+            db.add(balance)
+            db.flush()
+        balance.current_amount += reward_amount
+        balance.last_updated = now
+
+        transaction = Transaction(
+            balance_id=balance.id,
+            user_id=user_id,
+            amount=reward_amount,
+            transaction_type=TransactionType.QUEST,
+            description=f"クエスト報酬 #{quest_id}",
+            idempotency_key=idempotency_key,
+            created_at=now
+        )
+        db.add(transaction)
+        db.flush()
+        db.add(TransactionKey(
+            idempotency_key=idempotency_key,
+            user_id=user_id,
+            quest_id=quest_id,
+            transaction_id=transaction.id,
+            transaction_created_at=now
+        ))
+        db.commit()
+    except IntegrityError:
+        # 同じ冪等キーの取引が並行して登録された場合は、先に登録された結果を返す
+        db.rollback()
+        replayed = _replay(db, quest_id, user_id, idempotency_key)
+        if replayed:
+            return replayed
+        raise
+
+    return QuestCompletionResult(
+        quest_id=quest_id,
+        transaction_id=transaction.id,
+        reward_amount=reward_amount,
+        current_balance=balance.current_amount
+    )
+
+def bulk_complete_tasks(
+    db: Session,
+    task_ids: List[int],
+    user_id: int,
+    completed_at: datetime
+) -> List[Dict[str, object]]:
+    """
+    複数の定期タスクの完了記録をまとめて作成する
+
+    対象タスクの確認に1クエリ、完了記録の登録にバッチINSERTを使う（コミットは呼び出し側）。
+    PostgreSQLではRETURNING付きの複数行INSERT 1文にまとめられる
+
+    Returns:
+        List[Dict[str, object]]: 入力順の結果（id / status / completion_id）
+    """
+    if not task_ids:
+        return []
+
+    owned = {
+        task_id for task_id, in db.query(RegularTask.id).filter(
+            RegularTask.id.in_(set(task_ids)),
+            RegularTask.user_id == user_id,
+            RegularTask.is_active.is_(True)
+        )
+    }
+
+    completions: List[Tuple[int, TaskCompletion]] = [
+        (task_id, TaskCompletion(task_id=task_id, completed_at=completed_at))
+        for task_id in task_ids
+        if task_id in owned
+    ]
+    db.add_all([completion for _, completion in completions])
+    db.flush()
+
+    created = iter(completions)
+    results = []
+    for task_id in task_ids:
+        if task_id in owned:
+            _, completion = next(created)
+            results.append({"id": task_id, "status": "completed", "completion_id": completion.id})
+        else:
+            results.append({"id": task_id, "status": "not_found"})
+    return results
+
+def bulk_verify_completions(
+    db: Session,
+    completion_ids: List[int],
+    user_id: int
+) -> List[Dict[str, object]]:
+    """
+    複数の完了記録をまとめて確認済みにする
+
+    現在の状態の取得に1クエリ、更新に1回のUPDATE ... WHERE id IN を使うため、
+    件数に関係なくクエリ数は一定（コミットは呼び出し側）
+
+    Returns:
+        List[Dict[str, object]]: 入力順の結果（id / status）
+    """
+    if not completion_ids:
+        return []
+
+    current = dict(
+        db.query(TaskCompletion.id, TaskCompletion.verified)
+        .join(RegularTask, RegularTask.id == TaskCompletion.task_id)
+        .filter(
+            TaskCompletion.id.in_(set(completion_ids)),
+            RegularTask.user_id == user_id
+        )
+        .all()
+    )
+
+    to_verify = [completion_id for completion_id, verified in current.items() if not verified]
+    if to_verify:
+        db.execute(
+            update(TaskCompletion)
+            .where(TaskCompletion.id.in_(to_verify))
+            .values(verified=True)
+            .execution_options(synchronize_session=False)
+        )
+
+    results = []
+    for completion_id in completion_ids:
+        if completion_id not in current:
+            status = "not_found"
+        elif current[completion_id]:
+            status = "already_verified"
+        else:
+            status = "verified"
+        results.append({"id": completion_id, "status": status})
+    return results
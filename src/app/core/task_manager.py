@@ -1,9 +1,20 @@
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
 import asyncio
+import heapq
+import inspect
+import os
+import pickle
+import socket
+import time
+import uuid
 from enum import Enum
+from functools import partial
 import logging
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from app.core.job_store import InMemoryJobStore, Job, JobStore
+from app.core.metrics import Histogram
 
 logger = logging.getLogger(__name__)
 
@@ -14,34 +25,148 @@ class TaskStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
+class ExecutionMode(Enum):
+    """タスクの実行バックエンド"""
+    THREAD = "thread"    # スレッドプール（I/O待ちの多い処理向け）
+    PROCESS = "process"  # プロセスプール（GILを回避したいCPU負荷の高い処理向け）
+    INLINE = "inline"    # イベントループ上で直接実行（コルーチン・軽量な処理向け）
+
+def _run_chunk(func: Callable, chunk: List[Any]) -> List[Any]:
+    """
+    ワーカープロセス内でチャンク単位に関数を適用する
+
+    プロセス間でpickleされるため、モジュールのトップレベルに定義している
+    """
+    return [func(item) for item in chunk]
+
+def _to_timestamp(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value is not None else None
+
+def _from_timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value) if value is not None else None
+
+class TaskMetrics:
+    """タスク名ごとの実行統計"""
+
+    def __init__(self):
+        self.queue_wait = Histogram()  # 登録から実行開始までの待ち時間（秒）
+        self.run_time = Histogram()    # 実行時間（秒）
+        self.succeeded = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "queue_wait": self.queue_wait.snapshot(),
+            "run_time": self.run_time.snapshot(),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
+
 class Task:
-    def __init__(self, task_id: str, name: str, func, args=None, kwargs=None):
+    """
+    タスクの実行記録
+
+    大量に保持されるため__slots__で__dict__を持たせず、
+    日時もdatetimeではなくUNIX時刻（float）で保持する
+    """
+    __slots__ = (
+        "task_id", "name", "func", "args", "kwargs", "mode", "timeout",
+        "status", "result", "error", "handle",
+        "created_ts", "started_ts", "completed_ts",
+    )
+
+    def __init__(self, task_id: str, name: str, func, args=None, kwargs=None,
+                 mode: ExecutionMode = ExecutionMode.THREAD,
+                 timeout: Optional[float] = None):
         self.task_id = task_id
         self.name = name
         self.func = func
-        self.args = args or []
+        self.args = tuple(args) if args else ()
         self.kwargs = kwargs or {}
+        self.mode = mode
+        self.timeout = timeout
+        # 実行中のasyncio.Task（キャンセル用）
+        self.handle: Optional[asyncio.Future] = None
         self.status = TaskStatus.PENDING
         self.result = None
         self.error = None
-        self.created_at = datetime.now()
-        self.started_at: Optional[datetime] = None
-        self.completed_at: Optional[datetime] = None
+        self.created_ts: float = time.time()
+        self.started_ts: Optional[float] = None
+        self.completed_ts: Optional[float] = None
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.created_ts)
+
+    @property
+    def started_at(self) -> Optional[datetime]:
+        return _from_timestamp(self.started_ts)
+
+    @started_at.setter
+    def started_at(self, value: Optional[datetime]) -> None:
+        self.started_ts = _to_timestamp(value)
+
+    @property
+    def completed_at(self) -> Optional[datetime]:
+        return _from_timestamp(self.completed_ts)
+
+    @completed_at.setter
+    def completed_at(self, value: Optional[datetime]) -> None:
+        self.completed_ts = _to_timestamp(value)
 
 class TaskManager:
-    def __init__(self, max_workers: int = 5):
+    def __init__(
+        self,
+        max_workers: int = 5,
+        max_process_workers: Optional[int] = None,
+        max_tasks_per_process: int = 100,
+        job_store: Optional[JobStore] = None,
+        max_async_concurrency: int = 100
+    ):
         """
         タスク管理システムの初期化
         
         Args:
             max_workers (int): 同時実行可能な最大タスク数
+            max_process_workers (Optional[int]): プロセスプールのワーカー数（未指定時はCPU数）
+            max_tasks_per_process (int): プロセスプールを再生成するまでに処理するタスク数
+            job_store (Optional[JobStore]): 永続ジョブの保存先（未指定時はプロセス内のみ）
+            max_async_concurrency (int): イベントループ上で同時実行するコルーチンの最大数
         """
         self.tasks: Dict[str, Task] = {}
         self.max_workers = max_workers
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_process_workers = max_process_workers
+        self.max_tasks_per_process = max_tasks_per_process
+        # プロセスプールは初回利用時に生成する
+        self._process_executor: Optional[ProcessPoolExecutor] = None
+        self._process_task_count = 0
         self._lock = asyncio.Lock()
+        # コルーチンはスレッドを使わずイベントループ上で実行し、同時実行数のみ制限する
+        self.max_async_concurrency = max_async_concurrency
+        self._async_semaphore = asyncio.Semaphore(max_async_concurrency)
+        # 永続ジョブの保存先と、ジョブ名から実行関数への対応表
+        self.job_store = job_store or InMemoryJobStore()
+        self.handlers: Dict[str, Tuple[Callable, Optional[ExecutionMode]]] = {}
+        # 終了時刻順の最小ヒープ（終了時刻, タスクID）。期限切れのタスクを先頭から取り除く
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._reaper: Optional[asyncio.Task] = None
+        # 実行統計（タスク名ごと）と実行モードごとの実行中タスク数
+        self.metrics: Dict[str, TaskMetrics] = {}
+        self.in_flight: Dict[ExecutionMode, int] = {mode: 0 for mode in ExecutionMode}
 
-    async def add_task(self, task_id: str, name: str, func, *args, **kwargs) -> Task:
+    async def add_task(
+        self,
+        task_id: str,
+        name: str,
+        func,
+        *args,
+        mode: Optional[ExecutionMode] = None,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> Task:
         """
         新しいタスクを追加
         
@@ -50,18 +175,315 @@ class TaskManager:
             name (str): タスクの名前
             func: 実行する関数
             *args: 関数の位置引数
+            mode (Optional[ExecutionMode]): 実行バックエンド
+                （未指定時はコルーチン関数ならINLINE、それ以外はTHREAD）
+            timeout (Optional[float]): 実行のタイムアウト（秒）
             **kwargs: 関数のキーワード引数
         
         Returns:
             Task: 作成されたタスクオブジェクト
+
+        Raises:
+            ValueError: タスクIDが重複している場合、またはプロセス実行でpickleできない場合
         """
+        is_coroutine = asyncio.iscoroutinefunction(func)
+        if mode is None:
+            mode = ExecutionMode.INLINE if is_coroutine else ExecutionMode.THREAD
+        if mode == ExecutionMode.PROCESS:
+            if is_coroutine:
+                raise ValueError(f"Task {name} is a coroutine function and cannot run in process mode")
+            self._ensure_picklable(name, func, args, kwargs)
+
         async with self._lock:
             if task_id in self.tasks:
                 raise ValueError(f"Task with ID {task_id} already exists")
             
-            task = Task(task_id, name, func, args, kwargs)
+            task = Task(task_id, name, func, args, kwargs, mode=mode, timeout=timeout)
             self.tasks[task_id] = task
-            return task
+
+        # 完了済みタスクの定期削除は最初のタスク登録時に開始する（停止はshutdown）
+        if self._reaper is None:
+            self.start_reaper()
+        return task
+
+    def _ensure_picklable(self, name: str, *objects) -> None:
+        """
+        プロセスプールへ渡すオブジェクトがpickle可能か事前に検証する
+
+        ワーカー側で失敗するとエラー原因が分かりにくいため、登録時点で弾く
+        """
+        try:
+            pickle.dumps(objects)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise ValueError(
+                f"Task {name} cannot run in process mode: arguments are not picklable ({e})"
+            )
+
+    def _get_process_executor(self, n_tasks: int = 1) -> ProcessPoolExecutor:
+        """
+        プロセスプールを取得する
+
+        一定数のタスクを処理したプールは作り直し、ワーカーのメモリ増加を抑える
+
+        Args:
+            n_tasks (int): これから投入するタスク数
+        """
+        if (
+            self._process_executor is not None
+            and self._process_task_count >= self.max_tasks_per_process
+        ):
+            # 実行中のタスクは旧プールで完了させ、新規分から新しいプールを使う
+            self._process_executor.shutdown(wait=False)
+            self._process_executor = None
+            logger.info("Process pool recycled")
+
+        if self._process_executor is None:
+            self._process_executor = ProcessPoolExecutor(
+                max_workers=self.max_process_workers
+            )
+            self._process_task_count = 0
+
+        self._process_task_count += n_tasks
+        return self._process_executor
+
+    async def _run(self, task: Task) -> Any:
+        """
+        タスクの実行モードに応じて関数を実行する
+        """
+        if task.mode == ExecutionMode.INLINE:
+            if asyncio.iscoroutinefunction(task.func):
+                async with self._async_semaphore:
+                    task.started_ts = time.time()
+                    return await task.func(*task.args, **task.kwargs)
+            task.started_ts = time.time()
+            result = task.func(*task.args, **task.kwargs)
+            if inspect.isawaitable(result):
+                async with self._async_semaphore:
+                    result = await result
+            return result
+
+        if task.mode == ExecutionMode.PROCESS:
+            executor = self._get_process_executor()
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(
+                executor,
+                partial(task.func, *task.args, **task.kwargs)
+            )
+
+        def call():
+            # スレッドプールの空き待ちを待ち時間に含めるため、実際に動き出した時刻を記録する
+            task.started_ts = time.time()
+            return task.func(*task.args, **task.kwargs)
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, call)
+
+    async def map_in_process(
+        self,
+        func: Callable,
+        items: Iterable[Any],
+        chunksize: int = 100
+    ) -> List[Any]:
+        """
+        大量の入力に対してプロセスプールで関数を適用する
+
+        入力をチャンクに分けて投入するため、要素ごとのプロセス間通信を抑えられる
+        （シナリオ比較やモンテカルロ予測などのCPU負荷の高い処理向け）
+
+        Args:
+            func: 各要素に適用する関数（トップレベルに定義されている必要がある）
+            items: 入力要素
+            chunksize (int): 1回の投入にまとめる要素数
+
+        Returns:
+            List[Any]: 入力順に並んだ結果のリスト
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+
+        items = list(items)
+        self._ensure_picklable(getattr(func, "__name__", repr(func)), func)
+        chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+        if not chunks:
+            return []
+
+        executor = self._get_process_executor(len(chunks))
+        loop = asyncio.get_event_loop()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(executor, _run_chunk, func, chunk)
+            for chunk in chunks
+        ])
+        return [result for chunk_result in results for result in chunk_result]
+
+    def register_handler(
+        self,
+        name: str,
+        func: Callable,
+        mode: Optional[ExecutionMode] = None
+    ) -> None:
+        """
+        永続ジョブの実行関数を登録する
+
+        ジョブストアには関数そのものではなくジョブ名と引数を保存するため、
+        どのワーカープロセスでも同じ名前で関数を登録しておく必要がある
+
+        Args:
+            name (str): ジョブ名
+            func: 実行する関数
+            mode (Optional[ExecutionMode]): 実行バックエンド（未指定時は関数の種類から判定）
+        """
+        self.handlers[name] = (func, mode)
+
+    async def enqueue_job(
+        self,
+        name: str,
+        *args,
+        max_attempts: int = 3,
+        delay_seconds: float = 0,
+        job_id: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """
+        永続ジョブを登録する
+
+        引数はJSONで保存されるため、JSONに変換可能な値のみ渡せる
+
+        Args:
+            name (str): 登録済みのジョブ名
+            *args: 関数の位置引数
+            max_attempts (int): 最大試行回数
+            delay_seconds (float): 実行を開始するまでの待機時間（秒）
+            job_id (Optional[str]): ジョブID（未指定時は自動採番）
+            **kwargs: 関数のキーワード引数
+
+        Returns:
+            str: ジョブID
+        """
+        if name not in self.handlers:
+            raise ValueError(f"No handler registered for job {name}")
+
+        run_after = datetime.utcnow() + timedelta(seconds=delay_seconds)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None,
+            partial(
+                self.job_store.enqueue,
+                name,
+                list(args),
+                kwargs,
+                max_attempts=max_attempts,
+                run_after=run_after,
+                job_id=job_id
+            )
+        )
+
+    async def run_worker(
+        self,
+        worker_id: Optional[str] = None,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 60.0,
+        stop_event: Optional[asyncio.Event] = None
+    ) -> None:
+        """
+        ジョブストアからジョブを取得して実行し続けるワーカーループ
+
+        同時に実行するジョブ数はmax_workersまでに制限する。
+        リースは実行中に定期的に延長され、プロセスが落ちた場合は
+        リース切れ後に他のワーカーがジョブを引き継ぐ
+
+        Args:
+            worker_id (Optional[str]): ワーカーの識別子（未指定時はホスト名とPIDから生成）
+            poll_interval (float): ジョブがない場合のポーリング間隔（秒）
+            lease_seconds (float): リースの有効期間（秒）
+            stop_event (Optional[asyncio.Event]): セットされるとループを終了する
+        """
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        stop_event = stop_event or asyncio.Event()
+        loop = asyncio.get_event_loop()
+        running: set = set()
+
+        while not stop_event.is_set():
+            capacity = self.max_workers - len(running)
+            jobs: List[Job] = []
+            if capacity > 0:
+                try:
+                    jobs = await loop.run_in_executor(
+                        None, self.job_store.claim, worker_id, capacity, lease_seconds
+                    )
+                except Exception as e:
+                    logger.error(f"Worker {worker_id} failed to claim jobs: {e}")
+
+            for job in jobs:
+                job_task = asyncio.ensure_future(
+                    self._process_job(job, worker_id, lease_seconds)
+                )
+                running.add(job_task)
+                job_task.add_done_callback(running.discard)
+
+            if not jobs:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            elif len(running) >= self.max_workers:
+                await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+        if running:
+            await asyncio.wait(running)
+
+    async def _process_job(self, job: Job, worker_id: str, lease_seconds: float) -> None:
+        """
+        取得したジョブを実行し、結果をジョブストアに記録する
+        """
+        loop = asyncio.get_event_loop()
+        handler = self.handlers.get(job.name)
+        if handler is None:
+            await loop.run_in_executor(
+                None, self.job_store.fail, job.job_id, worker_id,
+                f"No handler registered for job {job.name}"
+            )
+            return
+
+        func, mode = handler
+        # 再試行時は前回の実行記録を置き換える
+        self.tasks.pop(job.job_id, None)
+        await self.add_task(job.job_id, job.name, func, *job.args, mode=mode, **job.kwargs)
+
+        heartbeat = asyncio.ensure_future(
+            self._keep_lease(job.job_id, worker_id, lease_seconds)
+        )
+        try:
+            await self.execute_task(job.job_id)
+        finally:
+            heartbeat.cancel()
+
+        task = self.tasks[job.job_id]
+        if task.status == TaskStatus.COMPLETED:
+            await loop.run_in_executor(
+                None, self.job_store.complete, job.job_id, worker_id, task.result
+            )
+        else:
+            await loop.run_in_executor(
+                None, self.job_store.fail, job.job_id, worker_id,
+                task.error or task.status.value
+            )
+
+    async def _keep_lease(self, job_id: str, worker_id: str, lease_seconds: float) -> None:
+        """
+        実行中のジョブのリースをリース期間の1/3ごとに延長する
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            try:
+                extended = await loop.run_in_executor(
+                    None, self.job_store.extend_lease, job_id, worker_id, lease_seconds
+                )
+                if not extended:
+                    logger.warning(f"Lease for job {job_id} was lost by worker {worker_id}")
+                    return
+            except Exception as e:
+                logger.error(f"Failed to extend lease for job {job_id}: {e}")
 
     async def execute_task(self, task_id: str) -> None:
         """
@@ -73,25 +495,88 @@ class TaskManager:
         task = self.tasks.get(task_id)
         if not task:
             raise ValueError(f"Task with ID {task_id} not found")
+        if task.status == TaskStatus.CANCELLED:
+            # 実行前にキャンセルされたタスク
+            return
 
         task.status = TaskStatus.RUNNING
-        task.started_at = datetime.now()
+        task.started_ts = time.time()
+        self.in_flight[task.mode] += 1
+        task.handle = asyncio.ensure_future(self._run(task))
 
         try:
-            loop = asyncio.get_event_loop()
-            task.result = await loop.run_in_executor(
-                self.executor,
-                task.func,
-                *task.args,
-                **task.kwargs
-            )
+            if task.timeout is not None:
+                task.result = await asyncio.wait_for(task.handle, timeout=task.timeout)
+            else:
+                task.result = await task.handle
             task.status = TaskStatus.COMPLETED
+        except asyncio.TimeoutError:
+            task.status = TaskStatus.FAILED
+            task.error = f"Task timed out after {task.timeout} seconds"
+            logger.error(f"Task {task_id} timed out after {task.timeout} seconds")
+        except asyncio.CancelledError:
+            # cancel_taskによるキャンセルは正常終了として扱い、
+            # 呼び出し元自体のキャンセルはそのまま伝播させる
+            if task.status != TaskStatus.CANCELLED:
+                task.status = TaskStatus.CANCELLED
+                task.handle.cancel()
+                raise
         except Exception as e:
             task.status = TaskStatus.FAILED
             task.error = str(e)
             logger.error(f"Task {task_id} failed: {e}")
         finally:
-            task.completed_at = datetime.now()
+            task.handle = None
+            self.in_flight[task.mode] -= 1
+            self._mark_finished(task)
+            self._record_metrics(task)
+
+    def _record_metrics(self, task: Task) -> None:
+        """
+        終了したタスクの待ち時間・実行時間・結果を統計に反映する
+        """
+        metrics = self.metrics.get(task.name)
+        if metrics is None:
+            metrics = self.metrics[task.name] = TaskMetrics()
+
+        if task.started_ts is not None:
+            metrics.queue_wait.observe(max(task.started_ts - task.created_ts, 0.0))
+            metrics.run_time.observe(max(task.completed_ts - task.started_ts, 0.0))
+
+        if task.status == TaskStatus.COMPLETED:
+            metrics.succeeded += 1
+        elif task.status == TaskStatus.CANCELLED:
+            metrics.cancelled += 1
+        else:
+            metrics.failed += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        実行統計を返す
+
+        Returns:
+            Dict[str, Any]:
+                - tasks: タスク名ごとの待ち時間・実行時間のヒストグラムと成功/失敗/キャンセル数
+                - in_flight: 実行モードごとの実行中タスク数
+                - saturation: 実行モードごとの使用率（実行中タスク数 / 同時実行上限。1を超える分は空き待ち）
+                - pending: 実行待ちのタスク数
+                - retained: 保持しているタスク数
+        """
+        process_workers = self.max_process_workers or os.cpu_count() or 1
+        capacity = {
+            ExecutionMode.THREAD: self.max_workers,
+            ExecutionMode.PROCESS: process_workers,
+            ExecutionMode.INLINE: self.max_async_concurrency,
+        }
+        return {
+            "tasks": {name: metrics.snapshot() for name, metrics in self.metrics.items()},
+            "in_flight": {mode.value: count for mode, count in self.in_flight.items()},
+            "saturation": {
+                mode.value: self.in_flight[mode] / capacity[mode] for mode in ExecutionMode
+            },
+            "pending": sum(1 for task in self.tasks.values() if task.status == TaskStatus.PENDING),
+            "retained": len(self.tasks),
+        }
 
     async def cancel_task(self, task_id: str) -> None:
         """
@@ -104,10 +589,18 @@ class TaskManager:
         if not task:
             raise ValueError(f"Task with ID {task_id} not found")
         
-        if task.status == TaskStatus.RUNNING:
-            # 実行中のタスクの場合は適切なキャンセル処理を実装
-            # この実装は環境に応じて調整が必要
+        if task.status == TaskStatus.PENDING:
             task.status = TaskStatus.CANCELLED
+            self._mark_finished(task)
+            # 実行されないため execute_task を通らない。キャンセル数はここで記録する
+            self._record_metrics(task)
+            logger.info(f"Task {task_id} cancelled before start")
+        elif task.status == TaskStatus.RUNNING:
+            # コルーチンはその場で中断される。スレッド・プロセスで実行中の関数は
+            # 途中で止められないため、結果を待たずにキャンセル扱いにする
+            task.status = TaskStatus.CANCELLED
+            if task.handle is not None:
+                task.handle.cancel()
             logger.info(f"Task {task_id} cancelled")
 
     def get_task(self, task_id: str) -> Optional[Task]:
@@ -131,31 +624,78 @@ class TaskManager:
         """
         return list(self.tasks.values())
 
-    def cleanup_completed_tasks(self, max_age_hours: int = 24) -> None:
+    def _mark_finished(self, task: Task) -> None:
+        """
+        タスクの終了時刻を記録し、期限切れ判定用のヒープに登録する
+        """
+        task.completed_ts = time.time()
+        heapq.heappush(self._expiry_heap, (task.completed_ts, task.task_id))
+
+    def cleanup_completed_tasks(self, max_age_hours: int = 24) -> int:
         """
         完了済みタスクのクリーンアップ
+
+        終了時刻順のヒープの先頭から期限切れのものだけを取り出すため、
+        保持しているタスク数に関係なく削除件数に比例した時間で終わる
         
         Args:
             max_age_hours (int): 保持する最大期間（時間）
+
+        Returns:
+            int: 削除したタスク数
+        """
+        cutoff = time.time() - max_age_hours * 3600
+        removed = 0
+
+        while self._expiry_heap and self._expiry_heap[0][0] < cutoff:
+            completed_ts, task_id = heapq.heappop(self._expiry_heap)
+            task = self.tasks.get(task_id)
+            # 再実行・置き換えで終了時刻が変わったタスクの古いエントリは読み飛ばす
+            if task is None or task.completed_ts != completed_ts:
+                continue
+            if task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
+                del self.tasks[task_id]
+                removed += 1
+
+        return removed
+
+    def start_reaper(self, interval_seconds: float = 300, max_age_hours: int = 24) -> None:
+        """
+        完了済みタスクを定期的に削除するバックグラウンド処理を開始する
+
+        add_taskから既定の設定で自動的に開始される。間隔を変える場合は最初のタスク登録より前に呼ぶ
+
+        Args:
+            interval_seconds (float): 削除処理の実行間隔（秒）
+            max_age_hours (int): 保持する最大期間（時間）
         """
-        current_time = datetime.now()
-        tasks_to_remove = []
-        
-        for task_id, task in self.tasks.items():
-            if task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]:
-                if task.completed_at:
-                    age = (current_time - task.completed_at).total_seconds() / 3600
-                    if age > max_age_hours:
-                        tasks_to_remove.append(task_id)
-        
-        for task_id in tasks_to_remove:
-            del self.tasks[task_id]
+        if self._reaper is not None and not self._reaper.done():
+            return
+
+        async def reap():
+            while True:
+                await asyncio.sleep(interval_seconds)
+                removed = self.cleanup_completed_tasks(max_age_hours)
+                if removed:
+                    logger.info(f"Reaped {removed} expired tasks")
+
+        self._reaper = asyncio.ensure_future(reap())
 
     async def shutdown(self):
         """
         タスクマネージャーのシャットダウン処理
         """
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
         self.executor.shutdown(wait=True)
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=True)
+            self._process_executor = None
+
+# アプリケーション共通のタスクマネージャー
+task_manager = TaskManager()
+
 async def example_usage():
     # タスクマネージャーの初期化
     task_manager = TaskManager(max_workers=3)
@@ -0,0 +1,122 @@
+from typing import Dict, List, Optional
+import logging
+
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+from app.core.db_manager import DatabaseManager, db_manager
+
+logger = logging.getLogger(__name__)
+
+# 並び順キーに使う文字（ASCII順に並んでいること）
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+_INDEX = {digit: index for index, digit in enumerate(DIGITS)}
+
+# キーがこの長さを超えたら、ユーザーのリスト全体を振り直す
+REBALANCE_KEY_LENGTH = 24
+
+def _midpoint(lower: str, upper: Optional[str]) -> str:
+    """
+    2つのキーの間に並ぶキーを求める
+
+    キーは「0.」以下の62進小数の桁列とみなす（末尾の0は持たない）。
+    upperがNoneの場合は1.0（末尾）として扱う
+    """
+    if upper is not None:
+        # 共通の先頭部分はそのまま引き継ぐ
+        n = 0
+        while n < len(upper) and (lower[n] if n < len(lower) else "0") == upper[n]:
+            n += 1
+        if n > 0:
+            return upper[:n] + _midpoint(lower[n:], upper[n:])
+
+    digit_lower = _INDEX[lower[0]] if lower else 0
+    digit_upper = _INDEX[upper[0]] if upper is not None else BASE
+    if digit_upper - digit_lower > 1:
+        return DIGITS[(digit_lower + digit_upper) // 2]
+
+    # 先頭の桁が隣り合っている場合は次の桁で分ける
+    if upper is not None and len(upper) > 1:
+        return upper[0]
+    return DIGITS[digit_lower] + _midpoint(lower[1:], None)
+
+def key_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    前後のアイテムの間に並ぶ並び順キーを返す
+
+    Args:
+        before (Optional[str]): 直前のアイテムのキー（先頭に置く場合はNone）
+        after (Optional[str]): 直後のアイテムのキー（末尾に置く場合はNone）
+
+    Returns:
+        str: before < key < after を満たすキー
+
+    Raises:
+        ValueError: キーの形式や大小関係が不正な場合
+    """
+    for key in (before, after):
+        if key is not None and (not key or key.endswith("0") or any(c not in _INDEX for c in key)):
+            raise ValueError(f"Invalid order key: {key!r}")
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Order keys are not ascending: {before!r} >= {after!r}")
+    return _midpoint(before or "", after)
+
+def evenly_spaced_keys(count: int) -> List[str]:
+    """
+    均等な間隔で並ぶcount個のキーを返す（全体の並べ替え・振り直し用）
+    """
+    if count <= 0:
+        return []
+
+    width = 1
+    while BASE ** width <= count * 4:
+        width += 1
+    span = BASE ** width
+    keys = []
+    for position in range(1, count + 1):
+        value = position * span // (count + 1)
+        digits = []
+        for _ in range(width):
+            value, remainder = divmod(value, BASE)
+            digits.append(DIGITS[remainder])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+def bulk_assign_order(db: Session, model, user_id: int, ordered_ids: List[int]) -> Dict[int, str]:
+    """
+    指定した順にキーを振り直し、1回の UPDATE ... CASE で書き込む（コミットは呼び出し側）
+
+    Args:
+        db (Session): データベースセッション
+        model: 並び順キー（order列）を持つモデル
+        user_id (int): ユーザーID
+        ordered_ids (List[int]): 新しい順に並べたアイテムID
+
+    Returns:
+        Dict[int, str]: アイテムIDごとの新しいキー
+    """
+    keys = dict(zip(ordered_ids, evenly_spaced_keys(len(ordered_ids))))
+    if keys:
+        db.execute(
+            update(model)
+            .where(model.user_id == user_id, model.id.in_(list(keys)))
+            .values(order=case(keys, value=model.id))
+            .execution_options(synchronize_session=False)
+        )
+    return keys
+
+def rebalance_order(model, user_id: int, db: DatabaseManager = db_manager) -> None:
+    """
+    ユーザーのリスト全体のキーを現在の順のまま短く振り直す
+
+    移動を繰り返してキーが長くなった場合にバックグラウンドで実行する
+    """
+    with db.get_db() as session:
+        ordered_ids = [
+            item_id for item_id, in session.query(model.id)
+            .filter(model.user_id == user_id)
+            .order_by(model.order, model.id)
+        ]
+        bulk_assign_order(session, model, user_id, ordered_ids)
+    logger.info(f"Rebalanced order keys of {len(ordered_ids)} items for user {user_id}")
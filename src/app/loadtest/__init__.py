@@ -0,0 +1,16 @@
+"""
+負荷試験
+
+合成した家族データを投入したローカルのDB（SQLite / PostgreSQL）に対して、
+FastAPIアプリケーションをプロセス内で起動し、複数の非同期クライアントから
+実際に近い比率のリクエストを送る。エンドポイントごとのスループットと
+p50 / p95 / p99 のレイテンシを出力し、SLOを下回った場合は失敗する
+
+    python -m app.loadtest --database-url sqlite:////tmp/loadtest.db --families 50 --duration 30
+
+app.main とモデルをそのまま読み込むため、アプリケーションが起動できる環境でのみ動く。
+現状のツリーでは、ルーター・モデルが参照する app.db.database / app.db.session /
+app.auth.dependencies / app.api.deps / app.crud.task / app.core.config / app.database
+などのモジュールと、jwt・passlib・psycopg がないため読み込みに失敗し、
+その場合は原因を表示して終了コード2で終了する（このツリーでは未検証）
+"""
@@ -0,0 +1,114 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import math
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """
+    昇順に並んだ値の分位点（最近接順位法）
+    """
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(q * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+@dataclass
+class EndpointStats:
+    """エンドポイントごとの計測結果"""
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Counter = field(default_factory=Counter)
+
+    def record(self, latency_ms: float, status: int, ok: bool) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.statuses[status] += 1
+        if not ok:
+            self.errors += 1
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies_ms)
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        """件数・スループット・エラー率・分位点"""
+        values = sorted(self.latencies_ms)
+        return {
+            "count": self.count,
+            "rps": self.count / duration if duration else 0.0,
+            "errors": self.errors,
+            "error_rate": self.errors / self.count if self.count else 0.0,
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+            "max": values[-1] if values else None,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+        }
+
+@dataclass
+class LoadTestReport:
+    """負荷試験全体の結果"""
+    duration: float
+    concurrency: int
+    endpoints: Dict[str, EndpointStats]
+
+    def total(self) -> EndpointStats:
+        """全エンドポイントを合算した結果"""
+        total = EndpointStats("*")
+        for stats in self.endpoints.values():
+            total.latencies_ms.extend(stats.latencies_ms)
+            total.errors += stats.errors
+            total.statuses.update(stats.statuses)
+        return total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "duration": self.duration,
+            "concurrency": self.concurrency,
+            "endpoints": {
+                name: stats.summary(self.duration) for name, stats in sorted(self.endpoints.items())
+            },
+            "total": self.total().summary(self.duration),
+        }
+
+    def format_table(self) -> str:
+        """端末に表示する表"""
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value:.1f}"
+
+        lines = [
+            f"duration {self.duration:.1f}s, concurrency {self.concurrency}",
+            f"{'endpoint':<32} {'count':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}",
+        ]
+        rows = [stats for _, stats in sorted(self.endpoints.items())] + [self.total()]
+        for stats in rows:
+            summary = stats.summary(self.duration)
+            lines.append(
+                f"{stats.name:<32} {summary['count']:>7} {summary['rps']:>8.1f} "
+                f"{summary['error_rate'] * 100:>6.2f} {ms(summary['p50']):>8} "
+                f"{ms(summary['p95']):>8} {ms(summary['p99']):>8}"
+            )
+        return "\n".join(lines)
+
+    def check_slos(self, slos: Dict[str, Dict[str, float]]) -> List[str]:
+        """
+        SLOを満たしているかを確認する
+
+        Args:
+            slos: エンドポイント名（"*"は全体）ごとの上限値
+                （p50 / p95 / p99 はミリ秒、error_rate は割合）
+
+        Returns:
+            List[str]: 満たしていない項目の説明（空なら合格）
+        """
+        violations = []
+        for name, limits in slos.items():
+            stats = self.total() if name == "*" else self.endpoints.get(name)
+            if stats is None or stats.count == 0:
+                continue
+            summary = stats.summary(self.duration)
+            for metric, limit in limits.items():
+                value = summary.get(metric)
+                if value is not None and value > limit:
+                    violations.append(f"{name} {metric} {value:.3f} > {limit}")
+        return violations
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+from typing import Dict, List
+import asyncio
+import random
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.core.db_manager import db_manager
+from app.core.security import security_manager
+from app.loadtest.report import EndpointStats, LoadTestReport
+from app.loadtest.scenarios import DEFAULT_MIX, Endpoint, pick
+
+# 負荷試験のクライアントがどのユーザーとしてアクセスするかを指定するヘッダー
+USER_HEADER = "X-Loadtest-User"
+
+def _override_current_user(request: Request) -> SimpleNamespace:
+    """認証の代わりにヘッダーのユーザーIDを使う"""
+    return SimpleNamespace(id=int(request.headers[USER_HEADER]))
+
+def _override_token_user(request: Request) -> dict:
+    return {"user_id": request.headers[USER_HEADER]}
+
+def _override_db():
+    db = db_manager.SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def install_overrides(app: FastAPI) -> None:
+    """
+    認証とDBセッションの依存関係を負荷試験用に差し替える
+
+    JWTの発行・検証は計測の対象外とし、ヘッダーで指定したユーザーとしてアクセスする。
+    DBセッションは DATABASE_URL で指定した負荷試験用のDBから取得する
+    """
+    from app.api.balance import router as balance
+    from app.api.tasks import router as tasks
+    from app.api.wishlist import router as wishlist
+
+    for module in (balance, tasks, wishlist):
+        app.dependency_overrides[module.get_current_user] = _override_current_user
+        app.dependency_overrides[module.get_db] = _override_db
+    app.dependency_overrides[security_manager.get_current_user] = _override_token_user
+
+async def run_load(
+    app: FastAPI,
+    user_ids: List[int],
+    mix: List[Endpoint] = DEFAULT_MIX,
+    concurrency: int = 20,
+    duration: float = 30.0,
+    warmup: float = 3.0,
+    seed: int = 0
+) -> LoadTestReport:
+    """
+    複数の非同期クライアントから、比率に従ってリクエストを送り続ける
+
+    アプリケーションはASGIで直接呼び出すため、ネットワークを介さずにアプリ自体の
+    処理時間（イベントループの待ちを含む）を計測できる
+
+    Args:
+        app (FastAPI): 対象のアプリケーション
+        user_ids (List[int]): アクセスに使うユーザーのID
+        mix (List[Endpoint]): 呼び出すエンドポイントと比率
+        concurrency (int): 同時に動かすクライアント数
+        duration (float): 計測する秒数
+        warmup (float): 計測前に空回しする秒数（キャッシュ・接続プールを温める）
+        seed (int): 乱数のシード
+
+    Returns:
+        LoadTestReport: 計測結果
+    """
+    stats: Dict[str, EndpointStats] = {endpoint.name: EndpointStats(endpoint.name) for endpoint in mix}
+    loop = asyncio.get_running_loop()
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        measure_from = loop.time() + warmup
+        deadline = measure_from + duration
+
+        async def worker(index: int) -> None:
+            rng = random.Random(seed * 100003 + index)
+            while loop.time() < deadline:
+                endpoint = pick(mix, rng)
+                headers = {USER_HEADER: str(rng.choice(user_ids))}
+                if endpoint.headers:
+                    headers.update(endpoint.headers(rng))
+                body = endpoint.body(rng) if endpoint.body else None
+
+                started = time.perf_counter()
+                try:
+                    response = await client.request(endpoint.method, endpoint.path, json=body, headers=headers)
+                    status = response.status_code
+                except Exception:
+                    # アプリケーション内の未処理の例外
+                    status = 0
+                elapsed_ms = (time.perf_counter() - started) * 1000
+
+                if loop.time() >= measure_from:
+                    stats[endpoint.name].record(elapsed_ms, status, status in endpoint.ok_statuses)
+
+        await asyncio.gather(*[worker(index) for index in range(concurrency)])
+
+    return LoadTestReport(duration=duration, concurrency=concurrency, endpoints=stats)
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+import random
+import uuid
+
+from app.core import DEFAULT_CONFIG
+
+API_PREFIX = DEFAULT_CONFIG["API_V1_PREFIX"]
+
+@dataclass
+class Endpoint:
+    """
+    負荷試験で呼び出すエンドポイント
+
+    weightは全体に占める呼び出し比率（相対値）。bodyはリクエストごとに本文を作る関数。
+    ok_statusesに含まれないステータスはエラーとして数える
+    """
+    name: str
+    method: str
+    path: str
+    weight: float
+    body: Optional[Callable[[random.Random], Any]] = None
+    headers: Optional[Callable[[random.Random], Dict[str, str]]] = None
+    ok_statuses: FrozenSet[int] = frozenset({200, 201, 304})
+
+def _deposit(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "amount": float(rng.choice([100, 300, 500])),
+        "transaction_type": "deposit",
+        "description": "負荷試験",
+    }
+
+def _batch_complete(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "complete_task_ids": [rng.randint(1, 500) for _ in range(rng.randint(1, 3))],
+        "verify_completion_ids": [],
+        "completed_at": datetime.utcnow().isoformat(),
+    }
+
+def _quest_complete(rng: random.Random) -> Dict[str, Any]:
+    return {"task_id": rng.randint(1, 500)}
+
+def _idempotency_key(rng: random.Random) -> Dict[str, str]:
+    return {"Idempotency-Key": uuid.UUID(int=rng.getrandbits(128)).hex}
+
+# 実際の利用に近い比率（アプリを開くたびの残高・ボードの表示が大半を占める）
+DEFAULT_MIX: List[Endpoint] = [
+    Endpoint("GET /balance/current", "GET", f"{API_PREFIX}/balance/current", 25),
+    Endpoint("GET /balance/history", "GET",
+             f"{API_PREFIX}/balance/history?limit=50&fields=created_at,amount,transaction_type", 12),
+    Endpoint("GET /balance/forecast", "GET", f"{API_PREFIX}/balance/forecast?days=30", 4),
+    Endpoint("POST /balance/deposit", "POST", f"{API_PREFIX}/balance/deposit", 3, body=_deposit),
+    Endpoint("GET /tasks/board", "GET", f"{API_PREFIX}/tasks/board", 20),
+    Endpoint("GET /tasks/list", "GET", f"{API_PREFIX}/tasks/list", 8),
+    Endpoint("PUT /tasks/complete/batch", "PUT", f"{API_PREFIX}/tasks/complete/batch", 4,
+             body=_batch_complete),
+    # 他のユーザーのクエストや完了済みのクエストを指定した場合の404 / 409は正常な応答として扱う
+    Endpoint("PUT /tasks/quest/complete", "PUT", f"{API_PREFIX}/tasks/quest/complete", 1,
+             body=_quest_complete, headers=_idempotency_key,
+             ok_statuses=frozenset({200, 404, 409})),
+    Endpoint("GET /wishlist/items", "GET", f"{API_PREFIX}/wishlist/items", 15),
+    Endpoint("GET /wishlist/affordability", "GET", f"{API_PREFIX}/wishlist/affordability", 8),
+]
+
+# エンドポイントごとのSLO（ミリ秒）と、全体のエラー率の上限
+DEFAULT_SLOS: Dict[str, Dict[str, float]] = {
+    "GET /balance/current": {"p95": 50, "p99": 100},
+    "GET /balance/history": {"p95": 100, "p99": 200},
+    "GET /tasks/board": {"p95": 100, "p99": 200},
+    "GET /wishlist/items": {"p95": 80, "p99": 150},
+    "*": {"p99": 500, "error_rate": 0.01},
+}
+
+def pick(mix: List[Endpoint], rng: random.Random) -> Endpoint:
+    """比率に従ってエンドポイントを1つ選ぶ"""
+    return rng.choices(mix, weights=[endpoint.weight for endpoint in mix], k=1)[0]
@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+from typing import List
+import random
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.rollups import apply_postings
+from app.core.wishlist_order import evenly_spaced_keys
+from app.models.balance import (
+    Balance,
+    DailyTransactionRollup,
+    MonthlyTransactionRollup,
+    Transaction,
+    TransactionKey,
+    TransactionType,
+)
+from app.models.task import Quest, RegularTask, TaskCompletion, TaskFrequency, TaskStatus
+from app.models.user import Settings, User
+from app.models.wishlist import WishlistItem
+
+# 負荷試験で作成・削除するテーブルのモデル
+SEED_MODELS = (
+    User, Settings, Balance, Transaction, TransactionKey,
+    DailyTransactionRollup, MonthlyTransactionRollup,
+    RegularTask, Quest, TaskCompletion, WishlistItem,
+)
+
+# 負荷試験用ユーザーのパスワードハッシュ（ログインは行わないためダミー）
+DUMMY_PASSWORD_HASH = "!loadtest"
+
+def create_schema(engine) -> None:
+    """負荷試験に使うテーブルを作成する"""
+    for metadata in {model.metadata for model in SEED_MODELS}:
+        metadata.create_all(
+            bind=engine,
+            tables=[model.__table__ for model in SEED_MODELS if model.metadata is metadata]
+        )
+
+def seed_families(
+    db: Session,
+    families: int,
+    seed: int = 0,
+    history_days: int = 90
+) -> List[int]:
+    """
+    合成した家族（子どものユーザーと、その残高・取引・お仕事・クエスト・欲しいもの）を投入する
+
+    件数のばらつきは実際の利用に近づけるため乱数で決める（seedで再現できる）
+
+    Args:
+        db (Session): データベースセッション
+        families (int): 作成する家族の数（1家族あたり子ども1〜3人）
+        seed (int): 乱数のシード
+        history_days (int): 取引・完了記録を作る過去の日数
+
+    Returns:
+        List[int]: 作成したユーザーのID
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    user_ids: List[int] = []
+
+    for family in range(families):
+        for child in range(rng.randint(1, 3)):
+            name = f"loadtest_{seed}_{family}_{child}"
+            user = User(
+                email=f"{name}@example.com",
+                username=name,
+                hashed_password=DUMMY_PASSWORD_HASH,
+                full_name=name
+            )
+            db.add(user)
+            db.flush()
+            user_ids.append(user.id)
+
+            db.add(Settings(user_id=user.id, savings_goal=rng.choice([0, 5000, 10000, 30000])))
+            balance = Balance(user_id=user.id, current_amount=0.0, savings_goal=rng.choice([None, 10000.0]))
+            db.add(balance)
+            db.flush()
+
+            transactions = []
+            amount = 0.0
+            for _ in range(rng.randint(30, 300)):
+                value = float(rng.choice([100, 300, 500, 1000]))
+                transaction_type = rng.choice(list(TransactionType))
+                if transaction_type == TransactionType.WITHDRAWAL:
+                    value = min(value, amount)
+                    amount -= value
+                else:
+                    amount += value
+                transactions.append({
+                    "balance_id": balance.id,
+                    "user_id": user.id,
+                    "amount": value,
+                    "transaction_type": transaction_type,
+                    "description": "負荷試験",
+                    "created_at": now - timedelta(minutes=rng.randint(0, history_days * 24 * 60)),
+                })
+            db.execute(insert(Transaction), transactions)
+            # まとめて登録した取引はORMのイベントが発生しないため、レポート用の集計に明示的に加算する
+            apply_postings(db.connection(), transactions)
+            balance.current_amount = amount
+
+            tasks = [
+                RegularTask(
+                    title=f"お手伝い{index}",
+                    description="負荷試験",
+                    reward_amount=rng.choice([50, 100, 200]),
+                    frequency=rng.choice([TaskFrequency.DAILY, TaskFrequency.WEEKLY, TaskFrequency.MONTHLY]),
+                    user_id=user.id,
+                    created_at=now - timedelta(days=history_days)
+                )
+                for index in range(rng.randint(3, 6))
+            ]
+            db.add_all(tasks)
+            db.flush()
+            completions = [
+                {
+                    "task_id": task.id,
+                    "completed_at": now - timedelta(days=rng.randint(0, history_days)),
+                    "verified": rng.random() < 0.7,
+                }
+                for task in tasks
+                for _ in range(rng.randint(0, 20))
+            ]
+            if completions:
+                db.execute(insert(TaskCompletion), completions)
+
+            db.add_all([
+                Quest(
+                    title=f"クエスト{index}",
+                    description="負荷試験",
+                    reward_amount=rng.choice([500, 1000, 3000]),
+                    difficulty=rng.randint(1, 5),
+                    duration_days=rng.choice([7, 14, 30]),
+                    status=rng.choice([TaskStatus.NOT_STARTED, TaskStatus.IN_PROGRESS]),
+                    start_date=now - timedelta(days=rng.randint(0, 10)),
+                    user_id=user.id
+                )
+                for index in range(rng.randint(1, 3))
+            ])
+
+            item_count = rng.randint(3, 15)
+            db.execute(insert(WishlistItem), [
+                {
+                    "user_id": user.id,
+                    "name": f"欲しいもの{index}",
+                    "price": rng.choice([500, 1500, 5000, 12000, 30000]),
+                    "priority": rng.randint(0, 5),
+                    "status": "active",
+                    "order": key,
+                }
+                for index, key in enumerate(evenly_spaced_keys(item_count))
+            ])
+
+    db.commit()
+    return user_ids
@@ -0,0 +1,75 @@
+"""
+MoneyKids バックエンドのアプリケーションエントリーポイント
+
+    uvicorn app.main:app
+"""
+import logging
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+
+from app.api.admin.router import router as admin_router
+from app.api.balance.router import router as balance_router
+from app.api.monitoring.router import router as monitoring_router
+from app.api.reports.router import router as reports_router
+from app.api.tasks.router import router as tasks_router
+from app.api.wishlist.router import router as wishlist_router
+from app.core import DEFAULT_CONFIG, __version__, init_app
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.core.monitoring import register_default_collectors
+from app.core.partitioning import maintain_partitions, register_partition_maintenance
+from app.core.profiling import ProfilingMiddleware
+from app.core.rollups import register_rollup_reconciliation
+from app.core.scheduler import scheduler
+from app.core.task_manager import task_manager
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title=DEFAULT_CONFIG["APP_NAME"], version=__version__)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=DEFAULT_CONFIG["BACKEND_CORS_ORIGINS"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+# 一覧系のレスポンスは件数が増えると大きくなるため、1KB以上は圧縮して返す
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+# PROFILE_SAMPLE_RATE の割合のリクエストと、署名付きのデバッグヘッダーを持つリクエストを計測する
+app.add_middleware(ProfilingMiddleware)
+# 最も外側に置き、圧縮・プロファイルを含めたレイテンシを記録する
+app.add_middleware(MetricsMiddleware)
+
+api_prefix = DEFAULT_CONFIG["API_V1_PREFIX"]
+app.include_router(balance_router, prefix=api_prefix)
+app.include_router(tasks_router, prefix=f"{api_prefix}/tasks", tags=["tasks"])
+app.include_router(wishlist_router, prefix=api_prefix)
+app.include_router(reports_router, prefix=api_prefix)
+app.include_router(admin_router, prefix=api_prefix)
+# Prometheus などの収集先が既定で参照するパスに置く
+app.include_router(monitoring_router)
+
+@app.on_event("startup")
+async def startup() -> None:
+    """起動時の初期化"""
+    init_app()
+    register_default_collectors()
+
+    # 先の月のパーティションが尽きると取引を登録できなくなるため、定期実行を待たずに起動時にも作成する
+    try:
+        await run_in_threadpool(maintain_partitions)
+    except Exception as e:
+        logger.error(f"Partition maintenance on startup failed: {e}")
+    register_partition_maintenance(scheduler)
+    # 取引の登録時に加算している日次・月次の集計を、取引テーブルから定期的に作り直して補正する
+    register_rollup_reconciliation(scheduler)
+    scheduler.start()
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    """終了時の後片付け（定期実行と完了済みタスクの定期削除を止め、ワーカーを終了する）"""
+    await scheduler.stop()
+    await task_manager.shutdown()
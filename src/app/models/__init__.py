@@ -1,26 +1,47 @@
 """
 Models initialization file for the MoneyKids application.
-This file imports and exports all database models to provide a single point of access.
+This file exports all database models to provide a single point of access.
+
+モデルは属性として初めて参照されたときに、定義しているモジュールごと読み込む（PEP 562）。
+ワーカーは実際に使うモデルの分だけ読み込みの時間を払えばよい。
+各モデルのモジュールは app.database / app.db.base_class / .database の Base を参照するため、
+それらがない環境ではパッケージの読み込みは成功しても名前の参照は ImportError になる
+
+    from app.models import User, Transaction  # 特定のモデルをインポート
 """
 
-from .user import User
-from .transaction import Transaction
-from .balance import Balance
-from .quest import Quest
-from .job import Job
-from .wishlist import WishlistItem
-from .alert import Alert
+from importlib import import_module
+from typing import Any, Dict, List
+
+# 公開する名前と、定義しているモジュールの対応
+_EXPORTS: Dict[str, str] = {
+    'User': '.user',
+    'Settings': '.user',
+    'Balance': '.balance',
+    'Transaction': '.balance',
+    'TransactionType': '.balance',
+    'DailyTransactionRollup': '.balance',
+    'MonthlyTransactionRollup': '.balance',
+    'RegularTask': '.task',
+    'Quest': '.task',
+    'TaskCompletion': '.task',
+    'TaskFrequency': '.task',
+    'TaskStatus': '.task',
+    'WorkPayout': '.task',
+    'WishlistItem': '.wishlist',
+}
 
 # Export all models
-__all__ = [
-    'User',
-    'Transaction',
-    'Balance',
-    'Quest',
-    'Job',
-    'WishlistItem',
-    'Alert'
-]
-from app.models import User, Transaction  # 特定のモデルをインポート
-# または
-from app.models import *  # すべてのモデルをインポート
\ No newline at end of file
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    # 2回目以降は通常の属性として参照できるようにする
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
 from app.database import Base
@@ -42,16 +42,30 @@ class Balance(Base):
         return self.current_amount
 
 class Transaction(Base):
-    """取引モデル"""
+    """
+    取引モデル
+
+    PostgreSQLではcreated_atによる月単位のレンジパーティションにできる（app.core.partitioning）。
+    その場合の主キーは (id, created_at) になるため、一意性が必要な値は別テーブルで管理する
+    """
     __tablename__ = "transactions"
 
     id = Column(Integer, primary_key=True, index=True)
     balance_id = Column(Integer, ForeignKey("balances.id"), nullable=False)
+    # 履歴・集計はユーザー単位で行うため、残高を経由せずに絞り込めるよう保持する
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     amount = Column(Float, nullable=False)
     transaction_type = Column(Enum(TransactionType), nullable=False)
     description = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # クライアントが指定する冪等キー（一意性は TransactionKey で保証する）
+    idempotency_key = Column(String(64), nullable=True)
+    # パーティションキーのためNULLは不可
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_transactions_user_created", "user_id", "created_at"),
+    )
+
     # リレーションシップ
     balance = relationship("Balance", back_populates="transactions")
 
@@ -72,4 +86,55 @@ class Transaction(Base):
         if self.transaction_type == TransactionType.WITHDRAWAL:
             if self.balance.current_amount < self.amount:
                 raise ValueError("残高が不足しています")
-        return True
\ No newline at end of file
+        return True
+
+class TransactionKey(Base):
+    """
+    取引の冪等キー
+
+    パーティション化した取引テーブルでは一意制約にcreated_atを含める必要があり、
+    冪等キー単体の一意性を保証できないため、このテーブルの主キーで保証する。
+    キーはクライアントが選ぶため、一意性はユーザーごとに保証する
+    """
+    __tablename__ = "transaction_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    idempotency_key = Column(String(64), primary_key=True)
+    # キーを使った処理の対象のクエスト（別のクエストへの再利用を検出するため。移行前のキーはNULL）
+    quest_id = Column(Integer, nullable=True)
+    # 取引の主キー（パーティション化後は (id, created_at)）
+    transaction_id = Column(Integer, nullable=False)
+    transaction_created_at = Column(DateTime, nullable=False)
+
+class DailyTransactionRollup(Base):
+    """
+    ユーザー・日・取引タイプごとの取引の集計（保護者向けレポート用）
+
+    取引の登録時に加算し（app.core.rollups）、定期的に取引テーブルから作り直して差分を補正する。
+    categoryは取引にカテゴリーを持たせるまでは空文字（主キーに含めるためNULLにしない）
+    """
+    __tablename__ = "transaction_daily_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    transaction_type = Column(Enum(TransactionType), primary_key=True)
+    category = Column(String(50), primary_key=True, default="")
+    total_amount = Column(Float, nullable=False, default=0.0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class MonthlyTransactionRollup(Base):
+    """
+    ユーザー・月・取引タイプごとの取引の集計（monthは月初の日付）
+
+    月をまたぐ推移のレポートを日次の集計を足し合わせずに返すために持つ
+    """
+    __tablename__ = "transaction_monthly_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    transaction_type = Column(Enum(TransactionType), primary_key=True)
+    category = Column(String(50), primary_key=True, default="")
+    total_amount = Column(Float, nullable=False, default=0.0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Enum, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -91,4 +91,23 @@ class TaskCompletion(Base):
     verified = Column(Boolean, default=False)
 
     # リレーションシップ
-    task = relationship("RegularTask", back_populates="completions")
\ No newline at end of file
+    task = relationship("RegularTask", back_populates="completions")
+
+class WorkPayout(Base):
+    """お仕事報酬の支払い記録モデル（期間ごとに1ユーザー1件）"""
+    __tablename__ = "work_payouts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    period_start = Column(DateTime, nullable=False)
+    period_end = Column(DateTime, nullable=False)
+    expected_count = Column(Integer, nullable=False)
+    verified_count = Column(Integer, nullable=False)
+    base_reward = Column(Integer, nullable=False)
+    paid_amount = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # 同じ期間の二重払いを防ぐ
+    __table_args__ = (
+        UniqueConstraint("user_id", "period_start", "period_end", name="uq_work_payouts_period"),
+    )
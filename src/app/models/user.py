@@ -5,7 +5,12 @@ from datetime import datetime
 from typing import Optional
 
 from app.db.base_class import Base
-from app.core.security import get_password_hash, verify_password
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_and_update_async,
+    verify_password
+)
 
 class User(Base):
     """ユーザーモデル"""
@@ -31,10 +36,31 @@ class User(Base):
             else:
                 setattr(self, key, value)
 
+    @classmethod
+    async def create(cls, password: Optional[str] = None, **kwargs) -> "User":
+        """
+        ユーザーを作成する（パスワードのハッシュ化をイベントループの外で行う）
+        """
+        user = cls(**kwargs)
+        if password is not None:
+            user.hashed_password = await get_password_hash_async(password)
+        return user
+
     def verify_password(self, password: str) -> bool:
         """パスワードを検証する"""
         return verify_password(password, self.hashed_password)
 
+    async def verify_password_async(self, password: str) -> bool:
+        """
+        パスワードを検証する（非同期版）
+
+        ハッシュのコストが現在の設定より低い場合は作り直して置き換える（コミットは呼び出し側）
+        """
+        valid, new_hash = await verify_and_update_async(password, self.hashed_password)
+        if valid and new_hash:
+            self.hashed_password = new_hash
+        return valid
+
     def update_balance(self, amount: float) -> None:
         """残高を更新する"""
         self.balance += amount
@@ -0,0 +1,32 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+# 並び順キーはバイト順で比較する必要があるため、PostgreSQLではCロケールの照合順序を使う
+OrderKey = String(64).with_variant(String(64, collation="C"), "postgresql")
+
+class WishlistItem(Base):
+    """欲しいものリストのアイテムモデル"""
+    __tablename__ = "wishlist_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    name = Column(String, nullable=False)
+    price = Column(Integer, nullable=False)
+    priority = Column(Integer, default=0)
+    url = Column(String, nullable=True)
+    memo = Column(String, nullable=True)
+    image_url = Column(String, nullable=True)
+    status = Column(String(16), nullable=False, default="active")
+    # 並び順キー（文字列の辞書順で並ぶ。移動時は移動したアイテムのキーだけを書き換える）
+    order = Column(OrderKey, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_wishlist_items_user_order", "user_id", "order"),
+    )
+
+    # リレーションシップ
+    user = relationship("User")
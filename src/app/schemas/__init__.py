@@ -1,60 +1,50 @@
 """
 Schema initialization file for the MoneyKids API.
 This file serves as the entry point for all Pydantic models and schema definitions.
+
+スキーマは属性として初めて参照されたときに、定義しているモジュールごと読み込む（PEP 562）
 """
 
-from .user import *
-from .balance import *
-from .transaction import *
-from .work import *
-from .quest import *
-from .wishlist import *
-from .settings import *
+from importlib import import_module
+from typing import Any, Dict, List
 
 # Version information
 __version__ = "1.0.0"
 
-# All models that should be exported
-__all__ = [
-    # User related schemas
-    'UserCreate',
-    'UserUpdate',
-    'UserInDB',
-    'UserResponse',
-    
+# 公開する名前と、定義しているモジュールの対応
+_EXPORTS: Dict[str, str] = {
     # Balance related schemas
-    'BalanceCreate',
-    'BalanceUpdate',
-    'BalanceInDB',
-    'BalanceResponse',
-    
-    # Transaction related schemas
-    'TransactionCreate',
-    'TransactionUpdate',
-    'TransactionInDB',
-    'TransactionResponse',
-    
-    # Work related schemas
-    'WorkCreate',
-    'WorkUpdate',
-    'WorkInDB',
-    'WorkResponse',
-    
-    # Quest related schemas
-    'QuestCreate',
-    'QuestUpdate',
-    'QuestInDB',
-    'QuestResponse',
-    
+    'TransactionType': '.balance',
+    'TransactionCreate': '.balance',
+    'BalanceResponse': '.balance',
+
+    # Task related schemas
+    'TaskCreate': '.task',
+    'TaskComplete': '.task',
+    'QuestRewardResponse': '.task',
+    'TaskBatchComplete': '.task',
+    'TaskBatchItemResult': '.task',
+    'TaskBatchResponse': '.task',
+
     # Wishlist related schemas
-    'WishlistItemCreate',
-    'WishlistItemUpdate',
-    'WishlistItemInDB',
-    'WishlistItemResponse',
-    
-    # Settings related schemas
-    'SettingsCreate',
-    'SettingsUpdate',
-    'SettingsInDB',
-    'SettingsResponse',
-]
\ No newline at end of file
+    'WishlistItemCreate': '.wishlist',
+    'WishlistItemResponse': '.wishlist',
+    'WishlistItemOrder': '.wishlist',
+    'WishlistReorderRequest': '.wishlist',
+    'WishlistMoveRequest': '.wishlist',
+}
+
+# All models that should be exported
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    # 2回目以降は通常の属性として参照できるようにする
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class TaskCreate(BaseModel):
     """
@@ -62,4 +62,64 @@ class TaskComplete(BaseModel):
         """
         タスクが親の確認を必要とするかどうかを返す
         """
-        return self.parent_verification
\ No newline at end of file
+        return self.parent_verification
+
+
+class QuestRewardResponse(BaseModel):
+    """
+    クエスト完了（即時報酬）のレスポンススキーマ
+
+    Attributes:
+        quest_id (int): 完了したクエストのID
+        transaction_id (int): 報酬の取引ID
+        reward_amount (float): 付与した報酬額
+        current_balance (float): 付与後の残高
+        replayed (bool): 同じ冪等キーで処理済みの結果を返した場合True
+    """
+    quest_id: int
+    transaction_id: int
+    reward_amount: float
+    current_balance: float
+    replayed: bool = False
+
+class TaskBatchComplete(BaseModel):
+    """
+    タスクの一括完了・一括確認のためのスキーマ
+
+    Attributes:
+        complete_task_ids (List[int]): 完了記録を作成する定期タスクのID
+        verify_completion_ids (List[int]): 親が確認済みにする完了記録のID
+        completed_at (datetime): 完了日時
+    """
+    complete_task_ids: List[int] = Field(default_factory=list, max_items=200)
+    verify_completion_ids: List[int] = Field(default_factory=list, max_items=200)
+    completed_at: datetime = Field(default_factory=datetime.now)
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "complete_task_ids": [1, 2],
+                "verify_completion_ids": [10, 11, 12],
+                "completed_at": "2024-11-29T10:00:00"
+            }
+        }
+
+class TaskBatchItemResult(BaseModel):
+    """
+    一括処理の各項目の結果
+
+    Attributes:
+        id (int): 対象のID（タスクIDまたは完了記録ID）
+        status (str): completed / verified / already_verified / not_found
+        completion_id (Optional[int]): 作成した完了記録のID
+    """
+    id: int
+    status: str
+    completion_id: Optional[int] = None
+
+class TaskBatchResponse(BaseModel):
+    """
+    タスクの一括完了・一括確認のレスポンススキーマ
+    """
+    completed: List[TaskBatchItemResult] = []
+    verified: List[TaskBatchItemResult] = []
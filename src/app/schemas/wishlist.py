@@ -0,0 +1,64 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+class WishlistItemCreate(BaseModel):
+    """欲しいものリストのアイテム作成のためのスキーマ"""
+    name: str = Field(..., min_length=1, max_length=255, description="品目名")
+    price: int = Field(..., ge=0, description="金額")
+    priority: int = Field(0, description="優先度")
+    url: Optional[str] = Field(None, description="商品ページのURL")
+    memo: Optional[str] = Field(None, max_length=500, description="メモ")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "name": "ゲームソフト",
+                "price": 5000,
+                "priority": 1,
+                "memo": "誕生日までに買いたい"
+            }
+        }
+
+class WishlistItemResponse(BaseModel):
+    """欲しいものリストのアイテムのレスポンススキーマ"""
+    id: int
+    name: str
+    price: int
+    priority: Optional[int] = None
+    url: Optional[str] = None
+    memo: Optional[str] = None
+    image_url: Optional[str] = None
+    order: str = Field(..., description="並び順キー（辞書順）")
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class WishlistItemOrder(BaseModel):
+    """並べ替え後の各アイテムの位置"""
+    item_id: int
+    new_order: int = Field(..., ge=0, description="新しい位置（小さいほど上）")
+
+class WishlistReorderRequest(BaseModel):
+    """欲しいものリスト全体の並べ替えのためのスキーマ"""
+    items: List[WishlistItemOrder] = Field(..., max_items=200)
+
+class WishlistMoveRequest(BaseModel):
+    """
+    ドラッグ&ドロップによる1件の移動のためのスキーマ
+
+    移動先の直前・直後のアイテムを指定する（先頭・末尾の場合は片方を省略）
+    """
+    item_id: int
+    before_id: Optional[int] = Field(None, description="移動先の直前のアイテムID")
+    after_id: Optional[int] = Field(None, description="移動先の直後のアイテムID")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "item_id": 3,
+                "before_id": 1,
+                "after_id": 2
+            }
+        }
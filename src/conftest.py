@@ -0,0 +1,9 @@
+"""
+pytestの設定
+
+このディレクトリ（src）をsys.pathに加え、テストから app パッケージをインポートできるようにする
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,24 @@
+"""
+お仕事報酬の予定回数（app.core.payout_periods.expected_occurrences）のテスト
+"""
+from app.core.payout_periods import expected_occurrences
+
+def test_weekly_run_excludes_monthly_task():
+    # 7日間の支払いでは月次タスクを予定に含めない（毎週月次の報酬全額を払わない）
+    assert expected_occurrences("monthly", 7) == 0
+    assert expected_occurrences("weekly", 7) == 1
+    assert expected_occurrences("daily", 7) == 7
+
+def test_monthly_run_counts_each_frequency():
+    for days in (28, 30, 31):
+        assert expected_occurrences("monthly", days) == 1
+        assert expected_occurrences("weekly", days) == 4
+        assert expected_occurrences("daily", days) == days
+
+def test_period_shorter_than_week_excludes_weekly_task():
+    assert expected_occurrences("weekly", 6) == 0
+    assert expected_occurrences("daily", 6) == 6
+
+def test_one_time_task_is_expected_once():
+    assert expected_occurrences("one_time", 7) == 1
+    assert expected_occurrences("one_time", 31) == 1